@@ -20,3 +20,11 @@ CREATE INDEX IF NOT EXISTS idx_content_collections_content_key ON public.content
 CREATE EXTENSION IF NOT EXISTS pg_trgm;
 CREATE INDEX IF NOT EXISTS idx_tmdb_enrichment_aka_trgm ON hermes.tmdb_enrichment USING gin (aka gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_tmdb_enrichment_keywords_trgm ON hermes.tmdb_enrichment USING gin (keywords gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_content_title_trgm ON public.content USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_content_original_title_trgm ON public.content USING gin (original_title gin_trgm_ops);
+
+-- Keyword search normalization (also installed by PGClient.ensure_tables and bitmagnet_setup).
+-- search_by_keyword falls back to an inline translate() when it is missing.
+CREATE OR REPLACE FUNCTION norm_search(text) RETURNS text
+AS $$ SELECT translate(lower($1), E' \t\r\n·・._-—–:：()（）[]【】{}《》"\'', '') $$
+LANGUAGE sql IMMUTABLE PARALLEL SAFE;
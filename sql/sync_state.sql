@@ -11,3 +11,20 @@ CREATE TABLE IF NOT EXISTS sync_state (
 );
 
 CREATE INDEX IF NOT EXISTS idx_sync_state_updated_at ON sync_state (updated_at);
+CREATE INDEX IF NOT EXISTS idx_sync_state_source_text_hash ON sync_state (source, text_hash);
+CREATE INDEX IF NOT EXISTS idx_sync_state_errors ON sync_state (source, updated_at) WHERE last_error IS NOT NULL;
+
+-- fetch_pending splits its candidate scan into UNION ALL branches (new rows via
+-- anti-join, rows newer than their sync_state entry, rows whose md5 changed).
+-- Each branch probes sync_state by (source, pg_id), which the primary key covers;
+-- the source table should be indexed on its updated_at_field, e.g.:
+-- CREATE INDEX IF NOT EXISTS idx_<table>_updated_at ON <table> (<updated_at_field>);
+
+-- Keyword search normalization (also installed by PGClient.ensure_tables).
+CREATE OR REPLACE FUNCTION norm_search(text) RETURNS text
+AS $$ SELECT translate(lower($1), E' \t\r\n·・._-—–:：()（）[]【】{}《》"\'', '') $$
+LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Optional: store the text hash on the source table and set pg.text_hash_field so
+-- fetch_pending compares hashes directly instead of running md5() per row:
+-- ALTER TABLE <table> ADD COLUMN text_hash TEXT GENERATED ALWAYS AS (md5(<text_field>)) STORED;
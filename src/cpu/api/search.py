@@ -27,7 +27,11 @@ CONFIG_PATH = os.getenv("CONFIG_PATH", "configs/example.yaml")
 logger = logging.getLogger(__name__)
 
 cfg = load_config(CONFIG_PATH)
-pg_client = PGClient(cfg.postgres["dsn"])
+pg_client = PGClient(
+    cfg.postgres["dsn"],
+    min_size=int(cfg.postgres.get("pool_min_size", 2)),
+    max_size=int(cfg.postgres.get("pool_max_size", 16)),
+)
 vector_store = create_vector_store(cfg.vector_store)
 _search_cfg = getattr(cfg, "search", {}) if hasattr(cfg, "search") else {}
 try:
@@ -1,10 +1,16 @@
+import itertools
 import re
-from typing import Any, Dict, Iterable, List, Sequence
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Sequence
 
 import psycopg
 import logging
 from psycopg import sql
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
+
+from cpu.core.utils import chunked
 
 logger = logging.getLogger(__name__)
 
@@ -20,62 +26,296 @@ CREATE TABLE IF NOT EXISTS sync_state (
     last_error TEXT,
     PRIMARY KEY (source, pg_id)
 );
-CREATE INDEX IF NOT EXISTS idx_sync_state_updated_at ON sync_state (updated_at);
 """
 
+# Run one statement at a time so ensure_tables(concurrently=True) can build them with
+# CREATE INDEX CONCURRENTLY, which is not allowed inside a multi-statement transaction.
+SYNC_INDEX_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_sync_state_updated_at ON sync_state (updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_sync_state_source_text_hash ON sync_state (source, text_hash)",
+    # Retry scans only look at failed rows.
+    "CREATE INDEX IF NOT EXISTS idx_sync_state_errors ON sync_state (source, updated_at) WHERE last_error IS NOT NULL",
+]
+
+# Punctuation/whitespace ignored by normalized keyword matching (CJK titles mix these freely).
+KEYWORD_STRIP_CHARS = " \t\r\n·・._-—–:：()（）[]【】{}《》\"'"
+KEYWORD_STRIP_TABLE = str.maketrans("", "", KEYWORD_STRIP_CHARS)
+
+# Normalization used by keyword search and its expression indexes; keeping the strip set in
+# one IMMUTABLE function keeps query text small and lets indexes match norm_search(col).
+NORM_SEARCH_FUNCTION_SQL = sql.SQL(
+    "CREATE OR REPLACE FUNCTION norm_search(text) RETURNS text "
+    "AS $$ SELECT translate(lower($1), {strip}, '') $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE"
+).format(strip=sql.Literal(KEYWORD_STRIP_CHARS))
+
+# How long search_by_keyword trusts a "norm_search() is missing" probe before asking again.
+NORM_SEARCH_RECHECK_SECONDS = 60.0
+
+# Split TMDB aka/keywords by common separators, but preserve complete titles.
+# Separators: Chinese comma, regular comma, pipe, slash, middle dot.
+# Do NOT split on spaces (would break "JoJo's Bizarre Adventure").
+TMDB_TOKEN_SPLITTER = re.compile(r"[，,|/·]+")
+
+# Plain column names accepted for keyword search / trigram index fields.
+IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Max ids bound (as one array) per fetch_by_ids statement; keeps each pipelined result bounded.
+FETCH_BY_IDS_CHUNK = 10000
+
+# Below this many rows executemany beats the COPY + merge round-trips in upsert_sync_state.
+SYNC_STATE_COPY_MIN_ROWS = 50
+
+# Upper bound on cached query templates (one per distinct source/field/where combination).
+QUERY_CACHE_MAX = 512
+
+# bytea ids in hex input form ("\x" + hex digits), e.g. bitmagnet info_hash.
+BYTEA_HEX_RE = re.compile(r"^\\x[0-9a-fA-F]+$")
+
+
+def _int_id_check(bits: int) -> Callable[[str], bool]:
+    low, high = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+    def check(value: str) -> bool:
+        try:
+            number = int(value)
+        except ValueError:
+            return False
+        # Only the canonical spelling can equal id::text, which is what the text path matched.
+        return str(number) == value and low <= number <= high
+
+    return check
+
+
+def _uuid_id_check(value: str) -> bool:
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+# id column types fetch_by_ids binds as a typed array, mapped to the check an id must pass to
+# cast cleanly. Ids failing it could never equal id::text, so they are dropped instead of
+# failing the whole chunk; other column types keep the text comparison.
+TYPED_ID_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "smallint": _int_id_check(16),
+    "integer": _int_id_check(32),
+    "bigint": _int_id_check(64),
+    "uuid": _uuid_id_check,
+    "bytea": lambda value: BYTEA_HEX_RE.fullmatch(value) is not None,
+    "text": lambda value: True,
+    "character varying": lambda value: True,
+}
+
+
+def _freeze(value: Any) -> Any:
+    """Turn nested config (dicts/lists) into a hashable cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 
 class PGClient:
-    def __init__(self, dsn: str) -> None:
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 16) -> None:
         self.dsn = dsn
+        # One pool per client: every query used to pay TCP + startup + auth on a fresh connection.
+        self.pool = ConnectionPool(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"row_factory": dict_row, "autocommit": True},
+            open=True,
+        )
+        self._query_cache: Dict[tuple, Any] = {}
+        self._id_types: Dict[tuple[str, str], str] = {}
+        self._norm_search_ready = False
+        self._norm_search_checked = float("-inf")
 
     def connect(self):
-        return psycopg.connect(self.dsn, row_factory=dict_row, autocommit=True)
+        """Borrow a pooled autocommit connection; use as ``with client.connect() as conn``."""
+        return self.pool.connection()
+
+    def close(self) -> None:
+        self.pool.close()
 
-    def ensure_tables(self) -> None:
+    def ensure_tables(self, concurrently: bool = False) -> None:
+        """Create sync_state, its indexes and norm_search().
+
+        With ``concurrently=True`` indexes are built with CREATE INDEX CONCURRENTLY so
+        re-running against a large production table does not block writers.
+        """
         with self.connect() as conn:
             with conn.cursor() as cur:
                 cur.execute(SYNC_TABLE_SQL)
+                for statement in SYNC_INDEX_SQL:
+                    if concurrently:
+                        statement = statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                    cur.execute(statement)
+                cur.execute(NORM_SEARCH_FUNCTION_SQL)
+        self._norm_search_ready = True
+
+    def _has_norm_search(self) -> bool:
+        """Whether norm_search() is installed; searches never create it (they may run read-only).
+
+        The search API may start against a DB the sync runner has not prepared yet, so a
+        missing function is re-checked at most every NORM_SEARCH_RECHECK_SECONDS.
+        """
+        if self._norm_search_ready:
+            return True
+        now = time.monotonic()
+        if now - self._norm_search_checked < NORM_SEARCH_RECHECK_SECONDS:
+            return False
+        self._norm_search_checked = now
+        with self.connect() as conn, conn.cursor() as cur:
+            cur.execute("SELECT to_regprocedure('norm_search(text)') IS NOT NULL AS installed")
+            row = cur.fetchone()
+        self._norm_search_ready = bool(row and row["installed"])
+        return self._norm_search_ready
+
+    def ensure_search_indexes(self, table: str, fields: Sequence[str]) -> None:
+        """Create trigram indexes for both search_by_keyword predicates on each field.
+
+        ``field ILIKE '%q%'`` uses a plain gin_trgm_ops index and the normalized branch
+        ``norm_search(field) LIKE '%q%'`` uses the matching expression index.
+        """
+        ident = IDENT_RE
+        table_name = table.rsplit(".", 1)[-1]
+        with self.connect() as conn, conn.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cur.execute(NORM_SEARCH_FUNCTION_SQL)
+            for field in fields:
+                if not ident.fullmatch(str(field or "")):
+                    continue
+                statements = [
+                    sql.SQL("CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({field} gin_trgm_ops)").format(
+                        name=sql.Identifier(f"idx_{table_name}_{field}_trgm"),
+                        table=self._table_identifier(table),
+                        field=sql.Identifier(field),
+                    ),
+                    sql.SQL(
+                        "CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                        "USING gin (norm_search({field}) gin_trgm_ops)"
+                    ).format(
+                        name=sql.Identifier(f"idx_{table_name}_{field}_norm_trgm"),
+                        table=self._table_identifier(table),
+                        field=sql.Identifier(field),
+                    ),
+                ]
+                try:
+                    for statement in statements:
+                        cur.execute(statement)
+                except psycopg.Error as exc:
+                    # Views (e.g. hermes.content_view) cannot be indexed; index the base table instead.
+                    logger.warning("Skip keyword index table=%s field=%s error=%s", table, field, exc)
+
+    def refresh_materialized_view(self, table: str, concurrently: bool = True) -> bool:
+        """REFRESH ``table`` if it is a materialized view; returns False for tables/plain views."""
+        with self.connect() as conn, conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+            row = cur.fetchone()
+            if not row or row["relkind"] != "m":
+                return False
+            statement = sql.SQL("REFRESH MATERIALIZED VIEW {mode}{table}").format(
+                mode=sql.SQL("CONCURRENTLY " if concurrently else ""),
+                table=self._table_identifier(table),
+            )
+            cur.execute(statement)
+        return True
 
     def fetch_pending(self, source: Dict[str, Any], batch_size: int) -> List[Dict[str, Any]]:
+        query, params = self._pending_query(source, batch_size)
+        with self.connect() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            return cur.fetchall()
+
+    def _pending_query(self, source: Dict[str, Any], batch_size: int) -> tuple[str, List[Any]]:
         pg_cfg = source["pg"]
+        cache_key = (
+            "fetch_pending",
+            pg_cfg["table"],
+            pg_cfg["id_field"],
+            pg_cfg["text_field"],
+            pg_cfg.get("updated_at_field"),
+            pg_cfg.get("text_hash_field"),
+            tuple(pg_cfg.get("extra_fields", [])),
+        )
+        query, branch_count = self._cached_query(cache_key, lambda: self._build_pending_sql(pg_cfg))
+        params: List[Any] = [source["name"], batch_size] * branch_count + [batch_size]
+        return query, params
+
+    @staticmethod
+    def _build_pending_sql(pg_cfg: Dict[str, Any]) -> tuple[str, int]:
         table = pg_cfg["table"]
         id_field = pg_cfg["id_field"]
         text_field = pg_cfg["text_field"]
         updated_at_field = pg_cfg.get("updated_at_field")
+        text_hash_field = pg_cfg.get("text_hash_field")
         extra_fields = pg_cfg.get("extra_fields", [])
 
+        if text_hash_field:
+            # Stored/generated md5 column: no per-row hashing, and the compare can use indexes.
+            hash_expr = f"t.{text_hash_field}"
+            base = f"{table} t"
+        else:
+            # Hash the text once per row; both the select list and the change check reuse m.h.
+            hash_expr = "m.h"
+            base = f"{table} t LEFT JOIN LATERAL (SELECT md5(t.{text_field}) AS h) m ON true"
+
         columns = [
             f"t.{id_field}::text AS pg_id",
             f"t.{text_field} AS text",
-            f"md5(t.{text_field}) AS text_hash",
+            f"{hash_expr} AS text_hash",
         ]
+        aliases = ["pg_id", "text", "text_hash"]
         if updated_at_field:
             columns.append(f"t.{updated_at_field} AS updated_at")
+            aliases.append("updated_at")
         for field in extra_fields:
             columns.append(f"t.{field} AS {field}")
+            aliases.append(field)
+        if updated_at_field:
+            order_field = "updated_at"
+        else:
+            # Keep the native id ordering (pg_id is text) without exposing it in the rows.
+            columns.append(f"t.{id_field} AS _order_key")
+            order_field = "_order_key"
 
+        select_list = ", ".join(columns)
+        join_on = f"s.source = %s AND s.pg_id = t.{id_field}::text"
+        changed = f"s.text_hash IS DISTINCT FROM {hash_expr}"
+        # Each branch is mutually exclusive so UNION ALL needs no dedupe, and each one
+        # can be planned against its own index instead of a seq-scan over an OR chain.
+        # New rows use NOT EXISTS so the planner probes the (source, pg_id) key per row
+        # rather than materializing sync_state for a LEFT JOIN ... IS NULL anti-join.
+        branches = [
+            f"SELECT {select_list} FROM {base} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM sync_state s WHERE {join_on})"
+        ]
         if updated_at_field:
-            conditions = [
-                "s.pg_id IS NULL",
-                f"t.{updated_at_field} > COALESCE(s.updated_at, to_timestamp(0))",
-                f"s.text_hash IS DISTINCT FROM md5(t.{text_field})",
-            ]
+            newer = f"t.{updated_at_field} > COALESCE(s.updated_at, to_timestamp(0))"
+            branches.append(f"SELECT {select_list} FROM {base} JOIN sync_state s ON {join_on} WHERE {newer}")
+            branches.append(
+                f"SELECT {select_list} FROM {base} JOIN sync_state s ON {join_on} "
+                f"WHERE ({newer}) IS NOT TRUE AND {changed}"
+            )
         else:
-            conditions = ["s.pg_id IS NULL", f"s.text_hash IS DISTINCT FROM md5(t.{text_field})"]
-        where = " OR ".join(f"({c})" for c in conditions)
-        order_field = updated_at_field or id_field
+            branches.append(f"SELECT {select_list} FROM {base} JOIN sync_state s ON {join_on} WHERE {changed}")
 
+        # Every branch keeps only its own top batch_size rows, so the outer sort stays small.
+        union_sql = "\n            UNION ALL\n            ".join(
+            f"({branch} ORDER BY {order_field} NULLS LAST LIMIT %s)" for branch in branches
+        )
         query = f"""
-        SELECT {", ".join(columns)}
-        FROM {table} t
-        LEFT JOIN sync_state s ON s.source = %s AND s.pg_id = t.{id_field}::text
-        WHERE {where}
+        WITH candidates AS (
+            {union_sql}
+        )
+        SELECT {", ".join(aliases)} FROM candidates
         ORDER BY {order_field} NULLS LAST
         LIMIT %s
         """
-        with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(query, (source["name"], batch_size))
-            return cur.fetchall()
+        return query, len(branches)
 
     def upsert_sync_state(
         self,
@@ -84,17 +324,16 @@ class PGClient:
     ) -> None:
         if not rows:
             return
-        records = [
-            (
-                source,
-                r["pg_id"],
-                r.get("text_hash"),
-                r.get("embedding_version"),
-                str(r.get("vector_id")),
-                float(r.get("nsfw_score", 0.0)),
-            )
-            for r in rows
-        ]
+        pg_ids = [r["pg_id"] for r in rows]
+        hashes = [r.get("text_hash") for r in rows]
+        versions = [r.get("embedding_version") for r in rows]
+        # Keep missing vector ids as NULL rather than the string "None".
+        vector_ids = [None if r.get("vector_id") is None else str(r["vector_id"]) for r in rows]
+        nsfw_scores = [float(r.get("nsfw_score", 0.0)) for r in rows]
+        records = list(zip(itertools.repeat(source), pg_ids, hashes, versions, vector_ids, nsfw_scores))
+        if len(records) >= SYNC_STATE_COPY_MIN_ROWS:
+            self._copy_sync_state(records)
+            return
         sql = """
         INSERT INTO sync_state (source, pg_id, text_hash, embedding_version, vector_id, nsfw_score, updated_at)
         VALUES (%s, %s, %s, %s, %s, %s, now())
@@ -109,15 +348,64 @@ class PGClient:
         with self.connect() as conn, conn.cursor() as cur:
             cur.executemany(sql, records)
 
-    def mark_failure(self, source: str, pg_id: str, error: str) -> None:
-        sql = """
-        INSERT INTO sync_state (source, pg_id, last_error, updated_at)
-        VALUES (%s, %s, %s, now())
+    def _copy_sync_state(self, records: List[tuple]) -> None:
+        """Stream records into a temp stage with COPY, then merge with one INSERT ... SELECT."""
+        # ON CONFLICT cannot touch the same row twice in one statement; keep the last record
+        # per (source, pg_id), as the executemany path does.
+        latest = {(record[0], record[1]): record for record in records}
+        merge_sql = """
+        INSERT INTO sync_state (source, pg_id, text_hash, embedding_version, vector_id, nsfw_score, updated_at)
+        SELECT source, pg_id, text_hash, embedding_version, vector_id, nsfw_score, now()
+        FROM _sync_stage
         ON CONFLICT (source, pg_id) DO UPDATE
-        SET last_error = EXCLUDED.last_error, updated_at = now()
+        SET text_hash = EXCLUDED.text_hash,
+            embedding_version = EXCLUDED.embedding_version,
+            vector_id = EXCLUDED.vector_id,
+            nsfw_score = EXCLUDED.nsfw_score,
+            updated_at = now(),
+            last_error = NULL
         """
+        with self.connect() as conn, conn.transaction(), conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE _sync_stage (LIKE sync_state INCLUDING DEFAULTS) ON COMMIT DROP")
+            with cur.copy(
+                "COPY _sync_stage (source, pg_id, text_hash, embedding_version, vector_id, nsfw_score) FROM STDIN"
+            ) as copy:
+                for record in latest.values():
+                    copy.write_row(record)
+            cur.execute(merge_sql)
+
+    def requeue_sync_state(self, source: str, pg_ids: Sequence[str]) -> None:
+        """Clear text_hash for ``pg_ids`` so fetch_pending returns them again."""
+        if not pg_ids:
+            return
         with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(sql, (source, pg_id, error[:512]))
+            cur.execute(
+                "UPDATE sync_state SET text_hash = NULL WHERE source = %s AND pg_id = ANY(%s)",
+                (source, list(pg_ids)),
+            )
+
+    def mark_failure(self, source: str, pg_id: str, error: str) -> None:
+        self.mark_failures([(source, pg_id, error)])
+
+    def mark_failures(self, items: Sequence[tuple[str, str, str]]) -> None:
+        """Record (source, pg_id, error) failures with one multi-row VALUES upsert."""
+        # ON CONFLICT cannot touch the same row twice in one statement; keep the last error.
+        latest = {(source, pg_id): error for source, pg_id, error in items}
+        if not latest:
+            return
+        statement = sql.SQL(
+            """
+            INSERT INTO sync_state (source, pg_id, last_error, updated_at)
+            VALUES {values}
+            ON CONFLICT (source, pg_id) DO UPDATE
+            SET last_error = EXCLUDED.last_error, updated_at = now()
+            """
+        ).format(values=sql.SQL(", ").join(sql.SQL("(%s, %s, %s, now())") for _ in latest))
+        params: List[Any] = []
+        for (source, pg_id), error in latest.items():
+            params.extend([source, pg_id, error[:512]])
+        with self.connect() as conn, conn.cursor() as cur:
+            cur.execute(statement, params)
 
     def fetch_sync_scores(self, source: str, ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
         if not ids:
@@ -130,10 +418,8 @@ class PGClient:
         with self.connect() as conn, conn.cursor() as cur:
             cur.execute(sql_text, (source, list(ids)))
             rows = cur.fetchall()
-            result: Dict[str, Dict[str, Any]] = {}
-            for row in rows:
-                result[str(row.get("pg_id"))] = dict(row)
-            return result
+            # dict_row already yields fresh dicts and sync_state.pg_id is TEXT; use both as-is.
+            return {row["pg_id"]: row for row in rows}
 
     def fetch_by_ids(
         self,
@@ -150,6 +436,7 @@ class PGClient:
         for f in pg_cfg.get("extra_fields", []):
             fields.append(f)
         joins = pg_cfg.get("joins", [])
+        where_extra = pg_cfg.get("where")
         id_list = list(ids)
 
         # Fast-path for bitmagnet torrent_files_view where id is "{info_hash_hex}:{index}".
@@ -160,58 +447,136 @@ class PGClient:
             and "torrent_files_view" in table
         ):
             file_id_pat = re.compile(r"^(?:\\x)?([0-9a-fA-F]{40}):(\d+)$")
-            parsed: List[tuple[str, int]] = []
-            for raw in id_list:
+            parsed: List[Any] = [None] * len(id_list)
+            for pos, raw in enumerate(id_list):
                 m = file_id_pat.fullmatch(str(raw))
                 if not m:
                     parsed = []
                     break
-                parsed.append((f"\\x{m.group(1)}", int(m.group(2))))
+                parsed[pos] = (f"\\x{m.group(1)}", int(m.group(2)))
             if parsed:
-                pair_placeholders = sql.SQL(", ").join(sql.SQL("(%s::bytea, %s)") for _ in parsed)
-                select_cols: List[sql.Composable] = []
-                for f in fields:
-                    if f == id_field:
-                        select_cols.append(
-                            sql.SQL("(encode(t.info_hash, 'hex') || ':' || t.index::text) AS {alias}").format(
-                                alias=sql.Identifier(f)
-                            )
-                        )
-                    else:
-                        select_cols.append(sql.SQL("t.{}").format(sql.Identifier(f)))
-                where_extra = pg_cfg.get("where")
-                base_sql = (
-                    "SELECT {selects} FROM public.torrent_files AS t "
-                    "WHERE (t.info_hash, t.index) IN ({pairs})"
+                cache_key = ("fetch_by_ids:files", tuple(fields), where_extra)
+                query = self._cached_query(
+                    cache_key,
+                    lambda: self._build_torrent_files_query(fields, id_field, where_extra),
                 )
-                if where_extra:
-                    base_sql += " AND ({where})"
-                query = sql.SQL(base_sql).format(
-                    selects=sql.SQL(", ").join(select_cols),
-                    pairs=pair_placeholders,
-                    where=sql.SQL(str(where_extra)) if where_extra else sql.SQL("TRUE"),
+                statements = []
+                for chunk in chunked(parsed, FETCH_BY_IDS_CHUNK):
+                    hashes, indexes = zip(*chunk)
+                    statements.append((query, [list(hashes), list(indexes)]))
+                return self._fetch_keyed(statements, id_field)
+
+        id_type = self._id_column_type(table, id_field)
+        id_check = TYPED_ID_CHECKS.get(id_type) if id_type else None
+        if id_check is None:
+            id_type = None
+        else:
+            id_list = [value for value in map(str, id_list) if id_check(value)]
+            if not id_list:
+                return {}
+        cache_key = ("fetch_by_ids", table, tuple(fields), _freeze(joins), where_extra, id_type)
+        query = self._cached_query(
+            cache_key,
+            lambda: self._build_fetch_by_ids_query(source, fields, id_type),
+        )
+        statements = [(query, [chunk]) for chunk in chunked(id_list, FETCH_BY_IDS_CHUNK)]
+        return self._fetch_keyed(statements, id_field)
+
+    def _id_column_type(self, table: str, id_field: str) -> str | None:
+        """Look up (once per table) the SQL type of id_field so ids bind as one typed array.
+
+        A failed lookup returns None (text comparison) and is retried on the next call.
+        """
+        cache_key = (table, id_field)
+        if cache_key in self._id_types:
+            return self._id_types[cache_key]
+        probe = sql.SQL("SELECT t.{id} FROM {table} AS t LIMIT 0").format(
+            id=sql.Identifier(id_field),
+            table=self._table_identifier(table),
+        )
+        try:
+            with self.connect() as conn, conn.cursor() as cur:
+                cur.execute(probe)
+                type_oid = cur.description[0].type_code
+                cur.execute("SELECT format_type(%s, NULL) AS name", (type_oid,))
+                type_name = cur.fetchone()["name"]
+        except psycopg.Error as exc:
+            logger.warning("Failed to resolve id type table=%s field=%s error=%s", table, id_field, exc)
+            return None
+        self._id_types[cache_key] = type_name
+        return type_name
+
+    def _fetch_keyed(
+        self,
+        statements: List[tuple[sql.Composable, List[Any]]],
+        key_field: str,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Run the per-chunk statements in one pipeline and merge rows keyed by key_field.
+
+        Both fetch_by_ids query shapes render key_field as text in SQL, so no str() is needed.
+        The statements bind ids as arrays, so their text is batch-size invariant and prepared.
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        with self.connect() as conn:
+            cursors = []
+            with conn.pipeline():
+                for query, params in statements:
+                    cur = conn.cursor()
+                    cur.execute(query, params, prepare=True)
+                    cursors.append(cur)
+            for cur in cursors:
+                with cur:
+                    for row in cur.fetchall():
+                        result[row[key_field]] = row
+        return result
+
+    @staticmethod
+    def _build_torrent_files_query(
+        fields: List[str],
+        id_field: str,
+        where_extra: Any,
+    ) -> sql.Composable:
+        select_cols: List[sql.Composable] = []
+        for f in fields:
+            if f == id_field:
+                select_cols.append(
+                    sql.SQL("(encode(t.info_hash, 'hex') || ':' || t.index::text) AS {alias}").format(
+                        alias=sql.Identifier(f)
+                    )
                 )
-                params: List[Any] = []
-                for h, idx in parsed:
-                    params.extend([h, idx])
-                with self.connect() as conn, conn.cursor() as cur:
-                    cur.execute(query, params)
-                    rows = cur.fetchall()
-                    result = {}
-                    for row in rows:
-                        key = str(row[id_field])
-                        result[key] = {k: row[k] for k in row}
-                    return result
-
-        # Optimize for bitmagnet info_hash (bytea) ids which are typically rendered as "\\x" + 40 hex chars.
-        bytea_pat = re.compile(r"^\\x[0-9a-fA-F]{40}$")
-        is_bytea_hex = bool(id_list) and all(isinstance(x, str) and bytea_pat.fullmatch(x) for x in id_list)
-        if is_bytea_hex:
-            placeholders = sql.SQL(", ").join(sql.SQL("%s::bytea") for _ in id_list)
+            else:
+                select_cols.append(sql.SQL("t.{}").format(sql.Identifier(f)))
+        base_sql = (
+            "SELECT {selects} FROM public.torrent_files AS t "
+            "WHERE (t.info_hash, t.index) IN (SELECT * FROM unnest(%s::bytea[], %s::int[]))"
+        )
+        if where_extra:
+            base_sql += " AND ({where})"
+        return sql.SQL(base_sql).format(
+            selects=sql.SQL(", ").join(select_cols),
+            where=sql.SQL(str(where_extra)) if where_extra else sql.SQL("TRUE"),
+        )
+
+    def _build_fetch_by_ids_query(
+        self,
+        source: Dict[str, Any],
+        fields: List[str],
+        id_type: str | None,
+    ) -> sql.Composable:
+        pg_cfg = source["pg"]
+        table = pg_cfg["table"]
+        id_field = pg_cfg["id_field"]
+        joins = pg_cfg.get("joins", [])
+        if id_type:
+            # Cast the bound text[] to the column's array type so the id index stays usable.
+            id_match = sql.SQL("t.{id_field} = ANY(%s::{array_type})").format(
+                id_field=sql.Identifier(id_field),
+                array_type=sql.SQL(f"{id_type}[]"),
+            )
         else:
-            placeholders = sql.SQL(", ").join(sql.Placeholder() for _ in id_list)
-        select_cols = []
-        group_by_cols = []
+            id_match = sql.SQL("t.{id_field}::text = ANY(%s)").format(id_field=sql.Identifier(id_field))
+        select_cols: List[sql.Composable] = []
+        group_by_cols: List[sql.Composable] = []
         for f in fields:
             if f == id_field:
                 select_cols.append(
@@ -290,7 +655,7 @@ class PGClient:
         where_extra = pg_cfg.get("where")
         base_sql = (
             "SELECT {selects} FROM {table} AS t {joins} "
-            "WHERE t.{id_field} IN ({placeholders})"
+            "WHERE {id_match}"
         )
         if where_extra:
             base_sql += " AND ({where})"
@@ -298,8 +663,7 @@ class PGClient:
             selects=sql.SQL(", ").join(select_cols),
             table=self._table_identifier(table),
             joins=sql.SQL(" ").join(join_clauses) if join_clauses else sql.SQL(""),
-            id_field=sql.Identifier(id_field),
-            placeholders=placeholders,
+            id_match=id_match,
             where=sql.SQL(str(where_extra)) if where_extra else sql.SQL("TRUE"),
         )
         if has_agg:
@@ -307,14 +671,7 @@ class PGClient:
                 base=query,
                 group_by=sql.SQL(", ").join(group_by_cols),
             )
-        with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(query, id_list)
-            rows = cur.fetchall()
-            result = {}
-            for row in rows:
-                key = str(row[id_field])
-                result[key] = {k: row[k] for k in row}
-            return result
+        return query
 
     def search_by_keyword(
         self,
@@ -330,7 +687,7 @@ class PGClient:
         where_extra = pg_cfg.get("where")
         if not query:
             return []
-        ident = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+        ident = IDENT_RE
         safe_fields = [f for f in fields if ident.fullmatch(str(f or ""))]
         if ident.fullmatch(str(text_field or "")) and text_field not in safe_fields:
             safe_fields.append(text_field)
@@ -338,21 +695,58 @@ class PGClient:
             safe_fields = [text_field]
 
         raw_pattern = f"%{query}%"
-        strip_chars = " \t\r\n·・._-—–:：()（）[]【】{}《》\"'"
-        normalized_query = query.translate({ord(ch): None for ch in strip_chars}).lower()
+        normalized_query = query.translate(KEYWORD_STRIP_TABLE).lower()
         normalized_pattern = f"%{normalized_query}%"
         enable_normalize = bool(pg_cfg.get("keyword_normalize")) or bool(
             re.search(r"[\u4e00-\u9fff]", query)
         )
 
+        use_normalized = enable_normalize and bool(normalized_query)
+        norm_function = use_normalized and self._has_norm_search()
+        cache_key = (
+            "search_by_keyword",
+            table,
+            id_field,
+            text_field,
+            tuple(safe_fields),
+            use_normalized,
+            norm_function,
+            where_extra,
+        )
+        statement = self._cached_query(
+            cache_key,
+            lambda: self._build_keyword_query(
+                table, id_field, text_field, safe_fields, use_normalized, where_extra, norm_function
+            ),
+        )
+        per_field = [raw_pattern, normalized_pattern] if use_normalized else [raw_pattern]
+        params = per_field * len(safe_fields) + [limit]
+        with self.connect() as conn, conn.cursor() as cur:
+            # The statement text is fixed per source config, so let the server keep its plan.
+            cur.execute(statement, params, prepare=True)
+            return cur.fetchall()
+
+    def _build_keyword_query(
+        self,
+        table: str,
+        id_field: str,
+        text_field: str,
+        safe_fields: List[str],
+        use_normalized: bool,
+        where_extra: Any,
+        norm_function: bool = True,
+    ) -> sql.Composable:
         def field_clause(field: str) -> sql.Composable:
             base = sql.SQL("{} ILIKE %s").format(sql.Identifier("t", field))
-            if not enable_normalize or not normalized_query:
+            if not use_normalized:
                 return base
-            normalized = sql.SQL("translate(lower({}), {}, '') LIKE %s").format(
-                sql.Identifier("t", field),
-                sql.Literal(strip_chars),
-            )
+            if norm_function:
+                normalized = sql.SQL("norm_search({}) LIKE %s").format(sql.Identifier("t", field))
+            else:
+                # Same normalization inline, for databases where norm_search() is not installed.
+                normalized = sql.SQL("translate(lower({}), {}, '') LIKE %s").format(
+                    sql.Identifier("t", field), sql.Literal(KEYWORD_STRIP_CHARS)
+                )
             return sql.SQL("({} OR {})").format(base, normalized)
 
         clause_sql = sql.SQL(" OR ").join([field_clause(f) for f in safe_fields])
@@ -360,7 +754,7 @@ class PGClient:
         if where_extra:
             where_sql = sql.SQL("{} AND ({})").format(where_sql, sql.SQL(str(where_extra)))
 
-        statement = sql.SQL(
+        return sql.SQL(
             """
             SELECT {id}::text AS pg_id, {text} AS title
             FROM {table} AS t
@@ -373,17 +767,13 @@ class PGClient:
             table=self._table_identifier(table),
             where=where_sql,
         )
-        params: List[Any] = []
-        for _ in safe_fields:
-            params.append(raw_pattern)
-            if enable_normalize and normalized_query:
-                params.append(normalized_pattern)
-        params.append(limit)
-        with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(statement, params)
-            return cur.fetchall()
 
-    def fetch_torrent_files(self, schema: str, info_hash_text: str, limit: int = 2000) -> List[Dict[str, Any]]:
+    def fetch_torrent_files(
+        self,
+        schema: str,
+        info_hash_text: str,
+        limit: int = 2000,
+    ) -> List[Dict[str, Any]]:
         sql_text = sql.SQL(
             """
             SELECT index, path, extension, size, updated_at
@@ -393,8 +783,8 @@ class PGClient:
             LIMIT %s
             """
         ).format(schema=sql.Identifier(schema))
-        with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(sql_text, (info_hash_text, limit))
+        with self.connect() as conn, conn.cursor(binary=True) as cur:
+            cur.execute(sql_text, (info_hash_text, limit), prepare=True)
             return cur.fetchall()
 
     def search_tmdb_expansions(
@@ -422,16 +812,18 @@ class PGClient:
         token2_pattern = f"%{non_ascii_parts[0]}%" if non_ascii_parts else pattern
         
         # Search both:
-        # 1. aka/keywords containing query (existing logic)
-        # 2. content.title matching query, then fetch aka from enrichment (new: cross-language expansion)
-        # 3. Also search aka for individual tokens to catch "JOJO的奇妙冒险" when searching "jojo奇妙冒险"
+        # 1. aka/keywords containing query, or aka containing all query tokens
+        #    (catches "JOJO的奇妙冒险" when searching "jojo奇妙冒险") -- one scan of tmdb_enrichment
+        # 2. content.title matching query, then fetch aka from enrichment (cross-language expansion)
+        # All ILIKE '%...%' predicates can use pg_trgm GIN indexes (see bitmagnet_setup.ensure_trgm_indexes).
         sql_text = sql.SQL(
             """
             WITH matched AS (
-                -- Match by aka/keywords (exact substring)
                 SELECT te.aka, te.keywords
                 FROM {schema}.tmdb_enrichment te
-                WHERE te.aka ILIKE %s OR te.keywords ILIKE %s
+                WHERE te.aka ILIKE %s
+                    OR te.keywords ILIKE %s
+                    OR (te.aka ILIKE %s AND te.aka ILIKE %s)
                 LIMIT %s
             ),
             title_matched AS (
@@ -443,27 +835,14 @@ class PGClient:
                 WHERE c.source = 'tmdb'
                     AND (c.title ILIKE %s OR c.original_title ILIKE %s)
                 LIMIT %s
-            ),
-            aka_token_matched AS (
-                -- Match aka containing all query tokens (flexible matching)
-                SELECT te.aka, te.keywords
-                FROM {schema}.tmdb_enrichment te
-                WHERE te.aka ILIKE %s AND te.aka ILIKE %s
-                LIMIT %s
             )
             SELECT aka, keywords FROM matched
             UNION ALL
             SELECT aka, keywords FROM title_matched
-            UNION ALL
-            SELECT aka, keywords FROM aka_token_matched
             """
         ).format(schema=sql.Identifier(schema))
         
         tokens: Dict[str, int] = {}
-        # Split aka/keywords by common separators, but preserve complete titles.
-        # Separators: Chinese comma, regular comma, pipe, slash
-        # Do NOT split on spaces (would break "JoJo's Bizarre Adventure")
-        splitter = re.compile(r"[，,|/·]+")
         timeout_ms_norm = None
         if timeout_ms is not None:
             try:
@@ -472,25 +851,35 @@ class PGClient:
                 timeout_ms_norm = None
 
         try:
-            with psycopg.connect(self.dsn, row_factory=dict_row, autocommit=False) as conn, conn.cursor() as cur:
-                if timeout_ms_norm and timeout_ms_norm > 0:
-                    cur.execute(f"SET LOCAL statement_timeout = {int(timeout_ms_norm)}")
-                cur.execute(sql_text, (
-                    pattern, pattern, limit,  # matched
-                    pattern, pattern, limit,  # title_matched
-                    token1_pattern, token2_pattern, limit,  # aka_token_matched
-                ))
-                for row in cur.fetchall():
-                    aka = row.get("aka") or ""
-                    keywords = row.get("keywords") or ""
-                    for item in splitter.split(str(aka)):
+            # SET LOCAL needs an explicit transaction; pooled connections are autocommit.
+            with self.connect() as conn, conn.transaction(), conn.cursor() as cur:
+                # Pipeline the SET LOCAL with the query so both go out in a single flush.
+                with conn.pipeline():
+                    if timeout_ms_norm and timeout_ms_norm > 0:
+                        cur.execute(f"SET LOCAL statement_timeout = {int(timeout_ms_norm)}")
+                    cur.execute(sql_text, (
+                        pattern, pattern, token1_pattern, token2_pattern, limit * 2,  # matched (+ aka tokens)
+                        pattern, pattern, limit,  # title_matched
+                    ))
+                rows = cur.fetchall()
+            # aka tokens (weight 2) always outrank keyword tokens (weight 1): take every aka
+            # first, then keywords only fill tokens not already present.
+            split = TMDB_TOKEN_SPLITTER.split
+            for row in rows:
+                aka = row.get("aka")
+                if aka:
+                    for item in split(str(aka)):
                         token = item.strip()
                         if token:
-                            tokens[token] = max(tokens.get(token, 0), 2)
-                    for item in splitter.split(str(keywords)):
+                            tokens[token] = 2
+            set_default = tokens.setdefault
+            for row in rows:
+                keywords = row.get("keywords")
+                if keywords:
+                    for item in split(str(keywords)):
                         token = item.strip()
                         if token:
-                            tokens[token] = max(tokens.get(token, 0), 1)
+                            set_default(token, 1)
         except Exception as exc:
             logger.warning(
                 "tmdb query_expand failed schema=%s query=%s error=%s",
@@ -511,7 +900,7 @@ class PGClient:
                 c.original_title,
                 c.release_year,
                 c.updated_at,
-                c.type,
+                c.type::text AS type,
                 te.genre,
                 te.keywords
             FROM public.content c
@@ -523,8 +912,8 @@ class PGClient:
             LIMIT %s
             """
         ).format(schema=sql.Identifier(schema))
-        with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(sql_text, (limit,))
+        with self.connect() as conn, conn.cursor(binary=True) as cur:
+            cur.execute(sql_text, (limit,), prepare=True)
             return cur.fetchall()
 
     def fetch_tmdb_detail(
@@ -533,53 +922,45 @@ class PGClient:
         content_type: str,
         tmdb_id: str,
     ) -> Dict[str, Any] | None:
+        # Exact (content_type, tmdb_id) hit first, else the latest row for tmdb_id. The Append
+        # node runs lazily, so the fallback branch is only executed when the first one misses.
         sql_text = sql.SQL(
             """
-            SELECT content_type,
-                   tmdb_id,
-                   imdb_id,
-                   aka,
-                   keywords,
-                   actors,
-                   directors,
-                   plot,
-                   genre,
-                   imdb_rating,
-                   douban_rating,
-                   raw,
-                   updated_at
-            FROM {schema}.tmdb_enrichment
-            WHERE content_type = %s AND tmdb_id = %s
-            """
-        ).format(schema=sql.Identifier(schema))
-        fallback_sql = sql.SQL(
-            """
-            SELECT content_type,
-                   tmdb_id,
-                   imdb_id,
-                   aka,
-                   keywords,
-                   actors,
-                   directors,
-                   plot,
-                   genre,
-                   imdb_rating,
-                   douban_rating,
-                   raw,
-                   updated_at
-            FROM {schema}.tmdb_enrichment
-            WHERE tmdb_id = %s
-            ORDER BY updated_at DESC NULLS LAST
+            (
+                SELECT {columns}
+                FROM {schema}.tmdb_enrichment
+                WHERE content_type = %s AND tmdb_id = %s
+            )
+            UNION ALL
+            (
+                SELECT {columns}
+                FROM {schema}.tmdb_enrichment
+                WHERE tmdb_id = %s
+                ORDER BY updated_at DESC NULLS LAST
+                LIMIT 1
+            )
             LIMIT 1
             """
-        ).format(schema=sql.Identifier(schema))
-        with self.connect() as conn, conn.cursor() as cur:
-            cur.execute(sql_text, (content_type, tmdb_id))
-            row = cur.fetchone()
-            if not row:
-                cur.execute(fallback_sql, (tmdb_id,))
-                row = cur.fetchone()
-            return row
+        ).format(
+            schema=sql.Identifier(schema),
+            columns=sql.SQL(
+                "content_type, tmdb_id, imdb_id, aka, keywords, actors, directors, plot, genre, "
+                "imdb_rating, douban_rating, raw, updated_at"
+            ),
+        )
+        with self.connect() as conn, conn.cursor(binary=True) as cur:
+            cur.execute(sql_text, (content_type, tmdb_id, tmdb_id), prepare=True)
+            return cur.fetchone()
+
+    def _cached_query(self, key: tuple, build: Callable[[], Any]) -> Any:
+        """Memoize a built statement (or statement + metadata) per key, capped at QUERY_CACHE_MAX."""
+        query = self._query_cache.get(key)
+        if query is None:
+            query = build()
+            if len(self._query_cache) >= QUERY_CACHE_MAX:
+                self._query_cache.clear()
+            self._query_cache[key] = query
+        return query
 
     @staticmethod
     def _table_identifier(table: str) -> sql.Identifier:
@@ -1,12 +1,44 @@
-import json
+import atexit
+import functools
+import hashlib
 import os
+import queue
+import sys
 import threading
 import time
 import uuid
+from concurrent.futures import Future
 from typing import Any, Dict, List
 
 import hnswlib
 import numpy as np
+import orjson
+
+
+_NAMESPACE_URL_BYTES = uuid.NAMESPACE_URL.bytes
+
+# Metas may carry NumPy scalars/arrays (e.g. scores straight from inference); orjson encodes
+# them natively instead of failing or needing a Python-side conversion pass.
+META_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+HTTP_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def point_ids_for(metas: List[Dict[str, Any]]) -> List[str]:
+    """uuid5(NAMESPACE_URL, "source:pg_id") for each meta, without building UUID objects.
+
+    Same ids as uuid.uuid5 (existing Qdrant points keep matching); the sha1 + version/variant
+    bits + hex formatting are done inline, which is ~3x faster per id.
+    """
+    sha1 = hashlib.sha1
+    prefix = _NAMESPACE_URL_BYTES
+    ids: List[str] = []
+    for meta in metas:
+        digest = bytearray(sha1(prefix + f"{meta['source']}:{meta['pg_id']}".encode()).digest()[:16])
+        digest[6] = (digest[6] & 0x0F) | 0x50
+        digest[8] = (digest[8] & 0x3F) | 0x80
+        h = digest.hex()
+        ids.append(f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}")
+    return ids
 
 
 class BaseVectorStore:
@@ -24,11 +56,137 @@ class BaseVectorStore:
     ) -> List[Dict[str, Any]]:
         raise NotImplementedError
 
+    def query_batch(
+        self,
+        embeddings: np.ndarray,
+        topk: int = 20,
+        metadata_filter: Dict[str, Any] | None = None,
+        offset: int = 0,
+    ) -> List[List[Dict[str, Any]]]:
+        """Run ``query`` for each row of ``embeddings``; stores with native batch search override this."""
+        return [
+            self.query(embeddings[i : i + 1], topk=topk, metadata_filter=metadata_filter, offset=offset)
+            for i in range(len(embeddings))
+        ]
+
     def size(self) -> int:
         raise NotImplementedError
 
+    def flush(self) -> None:
+        """Persist any buffered state; stores that write through on add need nothing here."""
+        return None
+
+    def unpersisted_keys(self) -> List[tuple[str, str]]:
+        """(source, pg_id) pairs whose vectors were lost in a crash; sync must re-embed them."""
+        return []
+
+    def clear_unpersisted(self, keys: List[tuple[str, str]]) -> None:
+        """Forget ``keys`` once they have been re-queued for sync."""
+        return None
+
+
+def _size_value(raw: Any) -> float:
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class _MetaColumns:
+    """Column-oriented HNSW metadata: one list per field, indexed by label.
+
+    Fields missing from a row read back as None. A single writer may mutate the table while
+    readers index into it without locking: columns always grow before ``present`` does, and a
+    row's fields are written before it is flagged present.
+    """
+
+    # Low-cardinality string columns; values are interned so 1M rows share a handful of objects.
+    SHARED_COLUMNS = frozenset({"source", "type", "category", "file_type"})
+
+    def __init__(self) -> None:
+        self.columns: Dict[str, List[Any]] = {}
+        self.present = bytearray()
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def reserve(self, size: int) -> None:
+        extra = size - len(self.present)
+        if extra <= 0:
+            return
+        for column in list(self.columns.values()):
+            column.extend([None] * extra)
+        self.present.extend(bytes(extra))
+
+    def set(self, label: int, meta: Dict[str, Any]) -> None:
+        if label >= len(self.present):
+            self.reserve(label + 1)
+        columns = self.columns
+        for name, value in meta.items():
+            if name in self.SHARED_COLUMNS and type(value) is str:
+                value = sys.intern(value)
+            column = columns.get(name)
+            if column is None:
+                column = [None] * len(self.present)
+                column[label] = value
+                columns[name] = column
+                continue
+            column[label] = value
+        if len(meta) < len(columns):
+            for name, column in columns.items():
+                if name not in meta:
+                    column[label] = None
+        if not self.present[label]:
+            self.present[label] = 1
+            self.count += 1
+
+    def get(self, label: int) -> Dict[str, Any] | None:
+        if label < 0 or label >= len(self.present) or not self.present[label]:
+            return None
+        return {name: column[label] for name, column in self.columns.items()}
+
+    def labels(self) -> List[int]:
+        present = self.present
+        return [label for label in range(len(present)) if present[label]]
+
+    def to_payload(self) -> Dict[str, Any]:
+        labels = self.labels()
+        return {
+            "labels": labels,
+            "columns": {name: [column[label] for label in labels] for name, column in self.columns.items()},
+        }
+
+    def load_payload(self, payload: Dict[str, Any]) -> None:
+        labels = payload.get("labels") or []
+        if not labels:
+            return
+        size = max(labels) + 1
+        self.reserve(size)
+        for name, values in (payload.get("columns") or {}).items():
+            if name in self.SHARED_COLUMNS:
+                values = [sys.intern(v) if type(v) is str else v for v in values]
+            column = [None] * size
+            for label, value in zip(labels, values):
+                column[label] = value
+            self.columns[name] = column
+        for label in labels:
+            self.present[label] = 1
+        self.count = len(labels)
+
 
 class HNSWVectorStore(BaseVectorStore):
+    """hnswlib index with label-addressed metadata.
+
+    ``add``/``compact`` are serialized by ``self.lock`` (single writer). ``query`` never takes
+    the lock: hnswlib's knn_query is safe alongside add_items, and _MetaColumns is laid out for
+    lock-free reads, so concurrent searches are not stalled behind a sync batch.
+    """
+
+    INDEX_FILE = "index.bin"
+    # Snapshot meta.json (and save the index) once meta.log grows past this fraction of it.
+    COMPACT_RATIO = 0.25
+
     def __init__(
         self,
         path: str,
@@ -38,25 +196,63 @@ class HNSWVectorStore(BaseVectorStore):
         ef_construction: int = 200,
         m: int = 16,
         ef_search: int = 64,
+        num_threads: int = -1,
+        save_interval_seconds: float = 30.0,
+        save_every_batches: int = 50,
+        max_query_depth: int = 2000,
     ) -> None:
         self.path = path
-        self.index_path = os.path.join(path, "index.bin")
+        self.index_path = os.path.join(path, self.INDEX_FILE)
         self.meta_path = os.path.join(path, "meta.json")
+        self.log_path = os.path.join(path, "meta.log")
+        # Byte length of meta.log covered by the last saved index; later records may lack vectors.
+        self.offset_path = os.path.join(path, "index.offset")
         self.dim = dim
         self.metric = metric
         self.max_elements = max_elements
         self.ef_construction = ef_construction
         self.m = m
         self.ef_search = ef_search
+        # Deepest rank (offset + topk) a query may page to; graph traversal cost grows with k.
+        self.max_query_depth = int(max_query_depth)
+        # Threads for graph inserts/searches inside the native index (-1 = all cores).
+        self.num_threads = int(num_threads)
         self.index = None
-        self.meta: Dict[int, Dict[str, Any]] = {}
+        self.meta = _MetaColumns()
         self.key_index: Dict[tuple[str, str], int] = {}
         self.next_label = 0
         self.lock = threading.Lock()
+        self._log_file = None
+        self._log_size = 0
+        self._snapshot_size = 0
+        # Numeric copy of the "size" column (NaN when unknown) so size_min filters in NumPy.
+        self._sizes = np.empty(0, dtype=np.float64)
+        # Upper bound of known sizes; a size_min above it cannot match, so the search is skipped.
+        self._size_max = float("-inf")
+        # Between compactions the graph is saved at most every save_interval_seconds or
+        # save_every_batches adds, bounding how far index.bin can lag behind meta.log.
+        self.save_interval_seconds = float(save_interval_seconds)
+        self.save_every_batches = int(save_every_batches)
+        self._dirty_batches = 0
+        self._last_save = time.monotonic()
+        # Keys logged after the last index save before a crash, kept until sync re-queues them.
+        self._unpersisted: Dict[tuple[str, str], None] = {}
+        # meta.log/meta.json still hold skipped records or re-queued keys; the next save compacts.
+        self._stale_meta = False
+        # Set once this instance writes; read-only openers (the search API) never compact files
+        # that a live sync writer owns, not even from the atexit flush.
+        self._wrote = False
         self._load_or_init()
+        atexit.register(self.flush)
 
     def _load_or_init(self) -> None:
         os.makedirs(self.path, exist_ok=True)
+        self._init_index()
+        self._load_meta()
+
+    def _init_index(self) -> None:
+        # hnswlib's "cosine" space already L2-normalizes vectors once on add/query and runs the
+        # SIMD inner-product kernel, so there is no per-distance sqrt to strip out here.
         self.index = hnswlib.Index(space=self.metric, dim=self.dim)
         if os.path.exists(self.index_path):
             self.index.load_index(self.index_path, max_elements=self.max_elements)
@@ -68,55 +264,201 @@ class HNSWVectorStore(BaseVectorStore):
                 M=self.m,
             )
         self.index.set_ef(self.ef_search)
-        self._load_meta()
+
+    def _save_index(self, path: str) -> None:
+        self.index.save_index(path)
+
+    def _write_index(self) -> None:
+        # Save next to the live file and swap it in, so a crash mid-save keeps the old graph.
+        tmp_path = f"{self.index_path}.tmp"
+        self._save_index(tmp_path)
+        os.replace(tmp_path, self.index_path)
+        self._write_log_offset(self._log_size)
+        self._dirty_batches = 0
+        self._last_save = time.monotonic()
+
+    def _write_log_offset(self, offset: int) -> None:
+        tmp_path = f"{self.offset_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self.offset_path)
+
+    def _read_log_offset(self) -> int | None:
+        # Stores written before the offset file existed treat the whole log as saved.
+        try:
+            with open(self.offset_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _index_count(self) -> int:
+        return self.index.get_current_count()
+
+    def _add_vectors(self, emb: np.ndarray, labels: List[int], replaced: List[int]) -> None:
+        # Existing labels are updated in place by add_items, so no mark_deleted pass is needed.
+        # add_items drops the GIL and inserts rows in parallel.
+        self.index.add_items(emb, labels, num_threads=self.num_threads)
+
+    def _search(self, emb: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        # One call for the whole batch; hnswlib spreads rows across threads.
+        return self.index.knn_query(emb, k=k, num_threads=self.num_threads)
 
     def _load_meta(self) -> None:
-        if not os.path.exists(self.meta_path):
-            return
-        with open(self.meta_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        self.next_label = int(data.get("next_label", 0))
-        for item in data.get("items", []):
-            label = int(item["label"])
-            meta = {k: v for k, v in item.items() if k != "label"}
-            self.meta[label] = meta
-            key = (meta["source"], str(meta["pg_id"]))
-            self.key_index[key] = label
-        if self.meta:
-            self.next_label = max(self.meta.keys()) + 1
+        meta_table = self.meta
+        key_index = self.key_index
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "rb") as f:
+                raw = f.read()
+            self._snapshot_size = len(raw)
+            data = orjson.loads(raw)
+            self.next_label = int(data.get("next_label", 0))
+            if "columns" in data:
+                meta_table.load_payload(data)
+                sources = meta_table.columns.get("source") or []
+                pg_ids = meta_table.columns.get("pg_id") or []
+                for label in meta_table.labels():
+                    key_index[(sources[label], str(pg_ids[label]))] = label
+            else:
+                # Row-oriented snapshot written before the columnar layout.
+                for item in data.get("items", []):
+                    label = int(item.pop("label"))
+                    meta_table.set(label, item)
+                    key_index[(sys.intern(item["source"]), str(item["pg_id"]))] = label
+            for source, pg_id in data.get("requeue", []):
+                self._unpersisted[(sys.intern(source), str(pg_id))] = None
+        if os.path.exists(self.log_path):
+            # Replay records appended since the last snapshot; a torn last line from a crash is dropped.
+            saved_offset = self._read_log_offset()
+            position = 0
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    start = position
+                    position += len(line)
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        break
+                    label = int(record["label"])
+                    meta = record["meta"]
+                    key = (sys.intern(meta["source"]), str(meta["pg_id"]))
+                    # Labels are never reused, even for records dropped below.
+                    if label >= self.next_label:
+                        self.next_label = label + 1
+                    if saved_offset is not None and start >= saved_offset:
+                        # Logged after the last index save: the vector is stale or missing.
+                        self._unpersisted[key] = None
+                        if label >= len(meta_table.present) or not meta_table.present[label]:
+                            # A new label never reached index.bin; keep no meta without a vector.
+                            self._stale_meta = True
+                            continue
+                    meta_table.set(label, meta)
+                    key_index[key] = label
+            self._log_size = os.path.getsize(self.log_path)
+        size_column = meta_table.columns.get("size") or []
+        self._sizes = np.fromiter((_size_value(v) for v in size_column), dtype=np.float64, count=len(size_column))
+        self._size_max = float(np.fmax.reduce(self._sizes, initial=-np.inf))
 
     def _persist(self) -> None:
-        items = []
-        for label, meta in self.meta.items():
-            record = {"label": int(label)}
-            record.update(meta)
-            items.append(record)
-        with open(self.meta_path, "w", encoding="utf-8") as f:
-            json.dump({"next_label": self.next_label, "items": items}, f)
-        self.index.save_index(self.index_path)
+        self._write_index()
+        snapshot = {"next_label": self.next_label, **self.meta.to_payload()}
+        if self._unpersisted:
+            snapshot["requeue"] = list(self._unpersisted)
+        payload = orjson.dumps(snapshot, option=META_JSON_OPTIONS)
+        # Write to a temp file and swap it in so a crash never leaves a truncated meta.json.
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.meta_path)
+        self._snapshot_size = len(payload)
+
+    def _append_log(self, labels: List[int], metas: List[Dict[str, Any]]) -> None:
+        if self._log_file is None:
+            self._log_file = open(self.log_path, "ab")
+        payload = b"".join(
+            orjson.dumps({"label": label, "meta": meta}, option=META_JSON_OPTIONS) + b"\n"
+            for label, meta in zip(labels, metas)
+        )
+        self._log_file.write(payload)
+        self._log_file.flush()
+        self._log_size += len(payload)
+        self._wrote = True
+
+    def compact(self) -> None:
+        """Save the index and a full meta snapshot, then truncate meta.log."""
+        with self.lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        self._persist()
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        # Reset the offset before truncating: a crash in between only re-queues saved rows.
+        self._write_log_offset(0)
+        with open(self.log_path, "wb"):
+            pass
+        self._log_size = 0
+        self._stale_meta = False
+
+    def flush(self) -> None:
+        with self.lock:
+            if self._wrote and (self._log_size or self._stale_meta):
+                self._compact_locked()
+
+    def unpersisted_keys(self) -> List[tuple[str, str]]:
+        return list(self._unpersisted)
+
+    def clear_unpersisted(self, keys: List[tuple[str, str]]) -> None:
+        with self.lock:
+            for key in keys:
+                if self._unpersisted.pop(key, False) is None:
+                    self._stale_meta = True
+                    self._wrote = True
 
     def add(self, embeddings: np.ndarray, metas: List[Dict[str, Any]]) -> List[int]:
-        labels: List[int] = []
+        emb = np.ascontiguousarray(embeddings, dtype=np.float32)
+        keys = [(sys.intern(meta["source"]), str(meta["pg_id"])) for meta in metas]
         with self.lock:
-            for emb, meta in zip(embeddings, metas):
-                key = (meta["source"], str(meta["pg_id"]))
-                label = self.key_index.get(key)
-                if label is None:
-                    label = self.next_label
-                    self.next_label += 1
-                else:
-                    try:
-                        self.index.mark_deleted(label)
-                    except Exception:
-                        pass
-                labels.append(label)
-                meta["pg_id"] = str(meta["pg_id"])
-                self.meta[label] = meta
-                self.key_index[key] = label
-            self.index.add_items(embeddings, labels)
-            self._persist()
+            key_index = self.key_index
+            labels = [key_index.get(key) for key in keys]
+            replaced = [label for label in labels if label is not None]
+            missing = [i for i, label in enumerate(labels) if label is None]
+            if missing:
+                new_labels = range(self.next_label, self.next_label + len(missing))
+                for i, label in zip(missing, new_labels):
+                    labels[i] = label
+                self.next_label += len(missing)
+            meta_table = self.meta
+            meta_table.reserve(self.next_label)
+            for key, label, meta in zip(keys, labels, metas):
+                meta["pg_id"] = key[1]
+                meta_table.set(label, meta)
+                key_index[key] = label
+            self._record_sizes(labels, metas)
+            self._add_vectors(emb, labels, replaced)
+            self._append_log(labels, metas)
+            self._dirty_batches += 1
+            if self._stale_meta or self._log_size > self.COMPACT_RATIO * self._snapshot_size:
+                self._compact_locked()
+            elif (
+                self._dirty_batches >= self.save_every_batches
+                or time.monotonic() - self._last_save >= self.save_interval_seconds
+            ):
+                self._write_index()
         return labels
 
+    def _record_sizes(self, labels: List[int], metas: List[Dict[str, Any]]) -> None:
+        sizes = self._sizes
+        if self.next_label > len(sizes):
+            # Grow by doubling into a new array and swap it in, so readers never see a resize.
+            grown = np.full(max(self.next_label, 2 * len(sizes), 1024), np.nan, dtype=np.float64)
+            grown[: len(sizes)] = sizes
+            sizes = grown
+        values = np.fromiter((_size_value(meta.get("size")) for meta in metas), dtype=np.float64, count=len(metas))
+        sizes[np.asarray(labels, dtype=np.int64)] = values
+        self._sizes = sizes
+        self._size_max = max(self._size_max, float(np.fmax.reduce(values, initial=-np.inf)))
+
     def query(
         self,
         embedding: np.ndarray,
@@ -124,36 +466,268 @@ class HNSWVectorStore(BaseVectorStore):
         metadata_filter: Dict[str, Any] | None = None,
         offset: int = 0,
     ) -> List[Dict[str, Any]]:
+        return self.query_batch(embedding, topk=topk, metadata_filter=metadata_filter, offset=offset)[0]
+
+    def query_batch(
+        self,
+        embeddings: np.ndarray,
+        topk: int = 20,
+        metadata_filter: Dict[str, Any] | None = None,
+        offset: int = 0,
+    ) -> List[List[Dict[str, Any]]]:
+        emb = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if emb.ndim == 1:
+            emb = emb.reshape(1, -1)
         if not self.meta:
-            return []
+            return [[] for _ in range(len(emb))]
+        offset = max(offset, 0)
+        depth = min(topk + offset, self.max_query_depth)
+        if depth <= offset:
+            return [[] for _ in range(len(emb))]
         size_min = metadata_filter.get("size_min") if metadata_filter else None
+        if size_min is not None and float(size_min) > self._size_max:
+            return [[] for _ in range(len(emb))]
         overfetch = 200 if size_min else 0
-        k = min(topk + max(offset, 0) + overfetch, len(self.meta))
-        labels, distances = self.index.knn_query(embedding, k=k)
-        candidates = list(zip(labels[0], distances[0]))
-        results: List[Dict[str, Any]] = []
-        for label, distance in candidates:
-            meta = self.meta.get(int(label))
-            if not meta:
-                continue
-            if size_min is not None:
-                raw_size = meta.get("size")
-                try:
-                    size_val = float(raw_size)
-                except (TypeError, ValueError):
-                    size_val = None
-                if size_val is None or size_val < float(size_min):
+        # Bound by the index count: meta replayed from meta.log may be ahead of the last saved index.
+        # No set_ef bump is needed for deep pages: hnswlib searches with max(ef, k) per call,
+        # which also keeps ef untouched for concurrent lock-free readers.
+        k = min(depth + overfetch, self._index_count())
+        if k <= 0:
+            return [[] for _ in range(len(emb))]
+        labels, distances = self._search(emb, k)
+        meta_table = self.meta
+        columns = list(meta_table.columns.items())
+        present = meta_table.present
+        label_block = np.asarray(labels).astype(np.int64, copy=False)
+        keep_rows = None
+        if size_min is not None:
+            # Filter the whole (N, k) block in one pass; unknown sizes are NaN and never pass.
+            sizes = self._sizes
+            in_range = (label_block >= 0) & (label_block < len(sizes))
+            keep = np.zeros(label_block.shape, dtype=bool)
+            keep[in_range] = sizes[label_block[in_range]] >= float(size_min)
+            keep_rows = keep.tolist()
+        # cosine and ip spaces both report 1 - dot product; only l2 is a true distance.
+        # Score the whole (N, k) block at once and unbox to Python floats in one call.
+        dist = np.asarray(distances, dtype=np.float64)
+        scores = (-dist if self.metric == "l2" else 1.0 - dist).tolist()
+        batches: List[List[Dict[str, Any]]] = []
+        for row, (row_labels, row_scores) in enumerate(zip(label_block.tolist(), scores)):
+            hits = zip(row_labels, row_scores)
+            if keep_rows is not None:
+                hits = (hit for hit, ok in zip(hits, keep_rows[row]) if ok)
+            results: List[Dict[str, Any]] = []
+            for i, score in hits:
+                if i < 0 or i >= len(present) or not present[i]:
                     continue
-            score = float(1 - distance) if self.metric == "cosine" else float(-distance)
-            result = {"score": score}
-            result.update(meta)
-            results.append(result)
-        return results[offset : offset + topk]
+                result = {"score": score}
+                for name, column in columns:
+                    result[name] = column[i]
+                results.append(result)
+            batches.append(results[offset:depth])
+        return batches
 
     def size(self) -> int:
         return len(self.meta)
 
 
+class USearchVectorStore(HNSWVectorStore):
+    """HNSWVectorStore with a USearch graph instead of hnswlib.
+
+    Metadata, meta.log and compaction are shared with the hnswlib store; only the index calls
+    differ. USearch ships SIMD kernels for f32/f16/i8, selected with ``dtype``.
+    """
+
+    INDEX_FILE = "index.usearch"
+    # Unlike hnswlib, USearch's "cos" kernel recomputes both norms per distance. Cosine stores
+    # keep unit vectors and search with "ip" instead, which ranks and scores identically.
+    METRICS = {"cosine": "ip", "ip": "ip", "l2": "l2sq"}
+
+    def __init__(
+        self,
+        path: str,
+        dim: int,
+        max_elements: int = 1_500_000,
+        metric: str = "cosine",
+        ef_construction: int = 200,
+        m: int = 16,
+        ef_search: int = 64,
+        dtype: str = "f32",
+        num_threads: int = -1,
+        save_interval_seconds: float = 30.0,
+        save_every_batches: int = 50,
+        max_query_depth: int = 2000,
+    ) -> None:
+        try:
+            from usearch.index import BatchMatches, Index
+        except Exception as exc:  # pragma: no cover - optional dep
+            raise ImportError("usearch is required for USearch vector store") from exc
+        self._index_cls = Index
+        self._batch_matches_cls = BatchMatches
+        self.dtype = dtype
+        super().__init__(
+            path,
+            dim,
+            max_elements=max_elements,
+            metric=metric,
+            ef_construction=ef_construction,
+            m=m,
+            ef_search=ef_search,
+            num_threads=num_threads,
+            save_interval_seconds=save_interval_seconds,
+            save_every_batches=save_every_batches,
+            max_query_depth=max_query_depth,
+        )
+
+    @property
+    def _threads(self) -> int:
+        # USearch uses 0 for "all cores".
+        return max(self.num_threads, 0)
+
+    def _init_index(self) -> None:
+        if self.metric not in self.METRICS:
+            raise ValueError(f"Unsupported metric for usearch: {self.metric}")
+        self.index = self._index_cls(
+            ndim=self.dim,
+            metric=self.METRICS[self.metric],
+            dtype=self.dtype,
+            connectivity=self.m,
+            expansion_add=self.ef_construction,
+            expansion_search=self.ef_search,
+        )
+        if os.path.exists(self.index_path):
+            self.index.load(self.index_path)
+
+    def _index_count(self) -> int:
+        return len(self.index)
+
+    def _normalized(self, emb: np.ndarray) -> np.ndarray:
+        if self.metric != "cosine":
+            return emb
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        return emb / np.maximum(norms, 1e-12)
+
+    def _add_vectors(self, emb: np.ndarray, labels: List[int], replaced: List[int]) -> None:
+        # USearch rejects duplicate keys, so drop the old vectors before re-adding them.
+        if replaced:
+            self.index.remove(np.asarray(replaced, dtype=np.uint64))
+        self.index.add(np.asarray(labels, dtype=np.uint64), self._normalized(emb), threads=self._threads)
+
+    def _search(self, emb: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        matches = self.index.search(self._normalized(emb), k, threads=self._threads)
+        if isinstance(matches, self._batch_matches_cls):
+            keys = matches.keys
+            distances = matches.distances
+            counts = np.asarray(matches.counts)
+        else:
+            # A one-row query comes back as Matches, already trimmed to its hits and without .counts.
+            keys = np.atleast_2d(matches.keys)
+            distances = np.atleast_2d(matches.distances)
+            counts = np.asarray([len(matches)])
+        # Rows with fewer than k hits are padded; mask them out with an out-of-range label.
+        columns = np.arange(keys.shape[1])
+        padded = columns[None, :] >= counts[:, None]
+        if padded.any():
+            keys = np.where(padded, np.iinfo(np.int64).max, keys.astype(np.int64))
+        return keys, distances
+
+    def _save_index(self, path: str) -> None:
+        self.index.save(path)
+
+
+class _SearchCoalescer:
+    """Merge concurrent single-vector searches into one batched request.
+
+    The first queued search opens a window of ``window_seconds``; everything that arrives
+    before it closes (up to ``max_batch``) goes out in one ``run_batch`` call. Callers wait
+    at most ``timeout`` seconds for their result.
+    """
+
+    def __init__(
+        self,
+        run_batch: Any,
+        window_seconds: float,
+        max_batch: int = 32,
+        timeout: float | None = None,
+    ) -> None:
+        self._run_batch = run_batch
+        self._window = window_seconds
+        self._max_batch = max_batch
+        self._timeout = timeout
+        self._queue: "queue.Queue[tuple[tuple, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="vector-search-coalescer", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: tuple) -> Any:
+        future: Future = Future()
+        self._queue.put((request, future))
+        return future.result(timeout=self._timeout)
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                results = self._run_batch([request for request, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            if len(results) != len(batch):
+                error = RuntimeError(f"search batch returned {len(results)} results for {len(batch)} queries")
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+@functools.lru_cache(maxsize=256)
+def _filter_payload(key: tuple) -> Dict[str, Any] | None:
+    """REST filter JSON for a QdrantVectorStore._filter_key; shared by every search path.
+
+    Cached per key: search traffic reuses a small set of filters, so the condition dicts are
+    built once. Callers must treat the result as read-only.
+    """
+    has_tmdb, genres, file_type, audio_langs, subtitle_langs, size_min = key
+    must_conditions: List[Dict[str, Any]] = []
+    if has_tmdb:
+        must_conditions.append({"key": "has_tmdb", "match": {"value": True}})
+    if genres:
+        must_conditions.append({"key": "genre_tags", "match": {"any": list(genres)}})
+    if file_type:
+        must_conditions.append({"key": "file_type", "match": {"value": file_type}})
+    if audio_langs:
+        must_conditions.append({"key": "audio_langs", "match": {"any": list(audio_langs)}})
+    if subtitle_langs:
+        must_conditions.append({"key": "subtitle_langs", "match": {"any": list(subtitle_langs)}})
+    if size_min is not None:
+        must_conditions.append({"key": "size", "range": {"gte": size_min}})
+    return {"must": must_conditions} if must_conditions else None
+
+
+@functools.lru_cache(maxsize=256)
+def _qdrant_filter(key: tuple) -> Any:
+    """qdrant-client Filter model parsed from the same payload as the REST fallback."""
+    from qdrant_client.http.models import Filter
+
+    payload = _filter_payload(key)
+    return Filter(**payload) if payload else None
+
+
+# (url, collection) pairs already checked/created in this process, so building another
+# QdrantVectorStore (e.g. once per celery task) skips the existence round trip.
+_READY_COLLECTIONS: set[tuple[str, str]] = set()
+
+
 class QdrantVectorStore(BaseVectorStore):
     def __init__(
         self,
@@ -164,6 +738,13 @@ class QdrantVectorStore(BaseVectorStore):
         api_key: str | None = None,
         timeout: float = 60.0,
         http_timeout: float = 30.0,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        upload_batch_size: int = 256,
+        quantization: str | None = None,
+        coalesce_ms: float = 0.0,
+        datatype: str | None = None,
+        http2: bool = False,
     ) -> None:
         try:
             from qdrant_client import QdrantClient
@@ -186,15 +767,63 @@ class QdrantVectorStore(BaseVectorStore):
             http_timeout_norm = float(http_timeout)
         except (TypeError, ValueError):
             http_timeout_norm = 30.0
-        self.client = QdrantClient(url=url, api_key=api_key, timeout=timeout_norm, check_compatibility=False)
+        # gRPC sends vectors as packed floats instead of JSON; the HTTP fallback below stays REST.
+        self.client = QdrantClient(
+            url=url,
+            api_key=api_key,
+            timeout=timeout_norm,
+            check_compatibility=False,
+            prefer_grpc=bool(prefer_grpc),
+            grpc_port=int(grpc_port),
+        )
+        self._upload_batch_size = max(1, int(upload_batch_size))
+        # With coalesce_ms > 0, concurrent query() calls are merged into search_batch round trips.
+        self._coalescer = None
+        if coalesce_ms and coalesce_ms > 0:
+            # A batch may hit the client timeout and then retry over the HTTP fallback.
+            self._coalescer = _SearchCoalescer(
+                self._search_many,
+                float(coalesce_ms) / 1000.0,
+                timeout=float(coalesce_ms) / 1000.0 + timeout_norm + http_timeout_norm,
+            )
         self._api_key = api_key
         self._http_timeout = http_timeout_norm
+        self._http = None
+        self._http2 = bool(http2)
         self._distance_name = "Cosine" if metric == "cosine" else "Dot"
-        vectors_config = VectorParams(size=dim, distance=distance)
+        # int8 scalar quantization keeps a 4x smaller copy of every vector in RAM for the HNSW
+        # traversal; Qdrant rescores the top hits against the original float32 vectors.
+        self._quantization = str(quantization).lower() if quantization else None
+        if self._quantization not in (None, "int8"):
+            raise ValueError(f"Unsupported qdrant quantization={quantization}")
+        # float16 storage halves vector RAM/disk on the server (new collections only).
+        self._datatype = str(datatype).lower() if datatype else None
+        if self._datatype not in (None, "float32", "float16"):
+            raise ValueError(f"Unsupported qdrant datatype={datatype}")
+        if self._datatype:
+            from qdrant_client.http.models import Datatype
+
+            vectors_config = VectorParams(size=dim, distance=distance, datatype=Datatype(self._datatype))
+        else:
+            vectors_config = VectorParams(size=dim, distance=distance)
+        quantization_config = None
+        if self._quantization == "int8":
+            from qdrant_client.http.models import (
+                ScalarQuantization,
+                ScalarQuantizationConfig,
+                ScalarType,
+            )
+
+            quantization_config = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
         init_error: Exception | None = None
         for _ in range(3):
+            if (url, collection) in _READY_COLLECTIONS:
+                break
             try:
                 self.client.get_collection(collection_name=collection)
+                _READY_COLLECTIONS.add((url, collection))
                 init_error = None
                 break
             except UnexpectedResponse as exc:
@@ -203,7 +832,9 @@ class QdrantVectorStore(BaseVectorStore):
                         self.client.recreate_collection(
                             collection_name=collection,
                             vectors_config=vectors_config,
+                            quantization_config=quantization_config,
                         )
+                        _READY_COLLECTIONS.add((url, collection))
                         init_error = None
                         break
                     except Exception as inner:
@@ -226,23 +857,44 @@ class QdrantVectorStore(BaseVectorStore):
             headers["api-key"] = str(self._api_key)
         return headers
 
-    def _http_request(self, method: str, path: str, json_body: Dict[str, Any] | None = None) -> Dict[str, Any]:
-        import httpx
+    def _http_client(self) -> Any:
+        # One pooled client for the fallback path: keep-alive connections instead of a new
+        # TCP (and TLS) handshake per request. HTTP/2 needs the optional h2 package.
+        if self._http is None:
+            import httpx
 
-        base_url = self.url.rstrip("/")
-        url = f"{base_url}{path}"
-        last_exc: Exception | None = None
-        last_status: int | None = None
-        for attempt in range(3):
             try:
-                resp = httpx.request(
-                    method,
-                    url,
-                    json=json_body,
+                self._http = httpx.Client(
+                    base_url=self.url.rstrip("/"),
+                    headers=self._http_headers(),
+                    timeout=self._http_timeout,
+                    trust_env=False,
+                    http2=self._http2,
+                )
+            except ImportError:
+                self._http = httpx.Client(
+                    base_url=self.url.rstrip("/"),
                     headers=self._http_headers(),
                     timeout=self._http_timeout,
                     trust_env=False,
                 )
+        return self._http
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def _http_request(self, method: str, path: str, json_body: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        client = self._http_client()
+        # orjson writes float32 ndarrays straight to JSON, so callers can pass vectors without tolist().
+        content = None if json_body is None else orjson.dumps(json_body, option=HTTP_JSON_OPTIONS)
+        headers = {"content-type": "application/json"} if content is not None else None
+        last_exc: Exception | None = None
+        last_status: int | None = None
+        for attempt in range(3):
+            try:
+                resp = client.request(method, path, content=content, headers=headers)
                 if resp.status_code in {502, 503, 504}:
                     last_status = int(resp.status_code)
                     last_exc = RuntimeError(f"HTTP {resp.status_code} from Qdrant")
@@ -266,34 +918,92 @@ class QdrantVectorStore(BaseVectorStore):
         except Exception:
             # Qdrant may be temporarily unavailable (e.g. 502); defer collection ensure to later retries.
             return
-        payload = {"vectors": {"size": int(self.dim), "distance": self._distance_name}}
+        payload: Dict[str, Any] = {"vectors": {"size": int(self.dim), "distance": self._distance_name}}
+        if self._datatype:
+            payload["vectors"]["datatype"] = self._datatype
+        if self._quantization == "int8":
+            payload["quantization_config"] = {
+                "scalar": {"type": "int8", "quantile": 0.99, "always_ram": True}
+            }
         try:
             self._http_request("PUT", f"/collections/{self.collection}", json_body=payload)
         except Exception:
             return
 
     def add(self, embeddings: np.ndarray, metas: List[Dict[str, Any]]) -> List[str]:
-        points: List[Dict[str, Any]] = []
-        point_ids: List[str] = []
-        for emb, meta in zip(embeddings, metas):
-            raw_id = f"{meta['source']}:{meta['pg_id']}"
-            point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, raw_id))
-            point_ids.append(point_id)
-            points.append({"id": point_id, "vector": emb.tolist(), "payload": meta})
+        point_ids = point_ids_for(metas)
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
         if self.client is not None:
             try:
-                from qdrant_client.http.models import PointStruct
-
-                structs = [PointStruct(id=p["id"], vector=p["vector"], payload=p["payload"]) for p in points]
-                self.client.upsert(collection_name=self.collection, points=structs, wait=True)
+                # upload_collection takes the ndarray as-is and streams it in batches.
+                self.client.upload_collection(
+                    collection_name=self.collection,
+                    vectors=vectors,
+                    payload=metas,
+                    ids=point_ids,
+                    batch_size=self._upload_batch_size,
+                    parallel=1,
+                    wait=True,
+                )
                 return point_ids
             except Exception:
                 # Qdrant may be temporarily unavailable (e.g. 502); fall back to raw HTTP retries.
                 self.client = None
+        points = [
+            {"id": point_id, "vector": vector, "payload": meta}
+            for point_id, vector, meta in zip(point_ids, vectors, metas)
+        ]
         self._ensure_collection_http()
         self._http_request("PUT", f"/collections/{self.collection}/points?wait=true", json_body={"points": points})
         return point_ids
 
+    @staticmethod
+    def _has_filter(metadata_filter: Dict[str, Any] | None) -> bool:
+        return bool(metadata_filter) and bool(
+            metadata_filter.get("has_tmdb")
+            or metadata_filter.get("genres")
+            or metadata_filter.get("file_type")
+            or metadata_filter.get("audio_langs")
+            or metadata_filter.get("subtitle_langs")
+            or metadata_filter.get("size_min") is not None
+        )
+
+    @classmethod
+    def _filter_key(cls, metadata_filter: Dict[str, Any] | None) -> tuple | None:
+        """Hashable projection of the fields Qdrant filters on (None when nothing filters)."""
+        if not cls._has_filter(metadata_filter):
+            return None
+        size_min = metadata_filter.get("size_min")
+        return (
+            bool(metadata_filter.get("has_tmdb")),
+            tuple(metadata_filter.get("genres") or ()),
+            metadata_filter.get("file_type") or None,
+            tuple(metadata_filter.get("audio_langs") or ()),
+            tuple(metadata_filter.get("subtitle_langs") or ()),
+            float(size_min) if size_min is not None else None,
+        )
+
+    def _query_filter(self, metadata_filter: Dict[str, Any] | None) -> Any:
+        key = self._filter_key(metadata_filter)
+        return None if key is None else _qdrant_filter(key)
+
+    def _http_filter(self, metadata_filter: Dict[str, Any] | None) -> Dict[str, Any] | None:
+        key = self._filter_key(metadata_filter)
+        return None if key is None else _filter_payload(key)
+
+    @staticmethod
+    def _hits_to_results(hits: Any) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for hit in hits:
+            if hasattr(hit, "payload"):
+                payload = hit.payload or {}
+                payload["score"] = float(hit.score)
+            else:
+                payload = hit.get("payload") or {}
+                payload["score"] = float(hit.get("score", 0.0))
+            results.append(payload)
+        return results
+
     def query(
         self,
         embedding: np.ndarray,
@@ -301,54 +1011,72 @@ class QdrantVectorStore(BaseVectorStore):
         metadata_filter: Dict[str, Any] | None = None,
         offset: int = 0,
     ) -> List[Dict[str, Any]]:
-        query_filter = None
-        if metadata_filter and (
-            metadata_filter.get("has_tmdb")
-            or metadata_filter.get("genres")
-            or metadata_filter.get("file_type")
-            or metadata_filter.get("audio_langs")
-            or metadata_filter.get("subtitle_langs")
-            or metadata_filter.get("size_min") is not None
-        ):
-            from qdrant_client.http.models import (
-                Filter,
-                FieldCondition,
-                MatchAny,
-                MatchValue,
-                Range,
-            )
+        request = (embedding[0], topk, metadata_filter, offset)
+        if self._coalescer is not None:
+            return self._coalescer.submit(request)
+        return self._search_one(*request)
 
-            must_conditions = []
-            if metadata_filter.get("has_tmdb"):
-                must_conditions.append(FieldCondition(key="has_tmdb", match=MatchValue(value=True)))
-            genres = metadata_filter.get("genres") or []
-            if genres:
-                must_conditions.append(
-                    FieldCondition(key="genre_tags", match=MatchAny(any=genres))
-                )
-            file_type = metadata_filter.get("file_type")
-            if file_type:
-                must_conditions.append(
-                    FieldCondition(key="file_type", match=MatchValue(value=file_type))
-                )
-            audio_langs = metadata_filter.get("audio_langs") or []
-            if audio_langs:
-                must_conditions.append(
-                    FieldCondition(key="audio_langs", match=MatchAny(any=audio_langs))
-                )
-            subtitle_langs = metadata_filter.get("subtitle_langs") or []
-            if subtitle_langs:
-                must_conditions.append(
-                    FieldCondition(key="subtitle_langs", match=MatchAny(any=subtitle_langs))
-                )
-            size_min = metadata_filter.get("size_min")
-            if size_min is not None:
-                must_conditions.append(
-                    FieldCondition(key="size", range=Range(gte=float(size_min)))
+    def query_batch(
+        self,
+        embeddings: np.ndarray,
+        topk: int = 20,
+        metadata_filter: Dict[str, Any] | None = None,
+        offset: int = 0,
+    ) -> List[List[Dict[str, Any]]]:
+        return self._search_many([(vector, topk, metadata_filter, offset) for vector in embeddings])
+
+    def _search_many(self, requests: List[tuple]) -> List[List[Dict[str, Any]]]:
+        """Run several (vector, topk, metadata_filter, offset) searches in one round trip."""
+        if len(requests) == 1:
+            return [self._search_one(*requests[0])]
+        if self.client is not None and hasattr(self.client, "search_batch"):
+            try:
+                from qdrant_client.http.models import SearchRequest
+
+                batch = self.client.search_batch(
+                    collection_name=self.collection,
+                    requests=[
+                        SearchRequest(
+                            vector=np.asarray(vector, dtype=np.float32).tolist(),
+                            limit=topk,
+                            offset=offset,
+                            filter=self._query_filter(metadata_filter),
+                            with_payload=True,
+                        )
+                        for vector, topk, metadata_filter, offset in requests
+                    ],
                 )
-            if must_conditions:
-                query_filter = Filter(must=must_conditions)
-        query_vector = embedding[0].tolist()
+                return [self._hits_to_results(hits) for hits in batch]
+            except Exception:
+                self.client = None
+        self._ensure_collection_http()
+        data = self._http_request(
+            "POST",
+            f"/collections/{self.collection}/points/search/batch",
+            json_body={
+                "searches": [
+                    {
+                        "vector": np.ascontiguousarray(vector, dtype=np.float32),
+                        "limit": topk,
+                        "with_payload": True,
+                        "filter": self._http_filter(metadata_filter),
+                        "offset": offset,
+                    }
+                    for vector, topk, metadata_filter, offset in requests
+                ]
+            },
+        )
+        return [self._hits_to_results(hits) for hits in (data.get("result") or [])]
+
+    def _search_one(
+        self,
+        vector: np.ndarray,
+        topk: int,
+        metadata_filter: Dict[str, Any] | None,
+        offset: int,
+    ) -> List[Dict[str, Any]]:
+        query_filter = self._query_filter(metadata_filter) if self.client is not None else None
+        query_vector = np.asarray(vector, dtype=np.float32).tolist()
         hits = None
         if self.client is not None and hasattr(self.client, "search"):
             try:
@@ -378,45 +1106,7 @@ class QdrantVectorStore(BaseVectorStore):
                 hits = None
         if hits is None:
             self._ensure_collection_http()
-            filter_payload = None
-            if metadata_filter and (
-                metadata_filter.get("has_tmdb")
-                or metadata_filter.get("genres")
-                or metadata_filter.get("file_type")
-                or metadata_filter.get("audio_langs")
-                or metadata_filter.get("subtitle_langs")
-                or metadata_filter.get("size_min") is not None
-            ):
-                must_conditions = []
-                if metadata_filter.get("has_tmdb"):
-                    must_conditions.append({"key": "has_tmdb", "match": {"value": True}})
-                genres = metadata_filter.get("genres") or []
-                if genres:
-                    must_conditions.append(
-                        {"key": "genre_tags", "match": {"any": genres}}
-                    )
-                file_type = metadata_filter.get("file_type")
-                if file_type:
-                    must_conditions.append(
-                        {"key": "file_type", "match": {"value": file_type}}
-                    )
-                audio_langs = metadata_filter.get("audio_langs") or []
-                if audio_langs:
-                    must_conditions.append(
-                        {"key": "audio_langs", "match": {"any": audio_langs}}
-                    )
-                subtitle_langs = metadata_filter.get("subtitle_langs") or []
-                if subtitle_langs:
-                    must_conditions.append(
-                        {"key": "subtitle_langs", "match": {"any": subtitle_langs}}
-                    )
-                size_min = metadata_filter.get("size_min")
-                if size_min is not None:
-                    must_conditions.append(
-                        {"key": "size", "range": {"gte": float(size_min)}}
-                    )
-                if must_conditions:
-                    filter_payload = {"must": must_conditions}
+            filter_payload = self._http_filter(metadata_filter)
             data = self._http_request(
                 "POST",
                 f"/collections/{self.collection}/points/search",
@@ -429,16 +1119,7 @@ class QdrantVectorStore(BaseVectorStore):
                 },
             )
             hits = data.get("result", [])
-        results: List[Dict[str, Any]] = []
-        for hit in hits:
-            if hasattr(hit, "payload"):
-                payload = hit.payload or {}
-                payload["score"] = float(hit.score)
-            else:
-                payload = hit.get("payload") or {}
-                payload["score"] = float(hit.get("score", 0.0))
-            results.append(payload)
-        return results
+        return self._hits_to_results(hits)
 
     def size(self) -> int:
         if self.client is not None:
@@ -473,7 +1154,9 @@ class MilvusVectorStore(BaseVectorStore):
         except Exception as exc:  # pragma: no cover - optional dep
             raise ImportError("pymilvus is required for Milvus vector store") from exc
 
-        connections.connect(alias="default", uri=uri)
+        # Reuse the process-wide connection; reconnecting per store leaks gRPC channels.
+        if not connections.has_connection("default"):
+            connections.connect(alias="default", uri=uri)
         self.collection_name = collection
         self.metric = metric
         self.dim = dim
@@ -495,10 +1178,14 @@ class MilvusVectorStore(BaseVectorStore):
     def add(self, embeddings: np.ndarray, metas: List[Dict[str, Any]]) -> List[str]:
         ids = [f"{m['source']}:{m['pg_id']}" for m in metas]
         payloads = metas
-        self.collection.insert([ids, embeddings.tolist(), payloads])
-        self.collection.flush()
+        # pymilvus packs ndarray rows itself; inserted rows are searchable from the growing
+        # segment, so sealing (flush) is left to flush() at the end of a sync run.
+        self.collection.insert([ids, np.ascontiguousarray(embeddings, dtype=np.float32), payloads])
         return ids
 
+    def flush(self) -> None:
+        self.collection.flush()
+
     def query(
         self,
         embedding: np.ndarray,
@@ -506,22 +1193,43 @@ class MilvusVectorStore(BaseVectorStore):
         metadata_filter: Dict[str, Any] | None = None,
         offset: int = 0,
     ) -> List[Dict[str, Any]]:
-        expr = ""
-        search_params = {"metric_type": "IP" if self.metric == "dot" else "COSINE"}
+        return self.query_batch(embedding, topk=topk, metadata_filter=metadata_filter, offset=offset)[0]
+
+    def query_batch(
+        self,
+        embeddings: np.ndarray,
+        topk: int = 20,
+        metadata_filter: Dict[str, Any] | None = None,
+        offset: int = 0,
+    ) -> List[List[Dict[str, Any]]]:
+        data = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+        offset = max(offset, 0)
+        limit = topk + offset
+        # The HNSW beam must cover the deepest rank requested, or deep pages lose recall.
+        search_params = {
+            "metric_type": "IP" if self.metric == "dot" else "COSINE",
+            "params": {"ef": max(limit, 64)},
+        }
+        # All rows go out in one search call; pymilvus packs ndarray rows without tolist().
         res = self.collection.search(
-            data=embedding.tolist(),
+            data=list(data),
             anns_field="vector",
             param=search_params,
-            limit=topk + max(offset, 0),
-            expr=expr,
+            limit=limit,
+            expr="",
             output_fields=["payload"],
         )
-        results: List[Dict[str, Any]] = []
-        for hit in res[0][offset : offset + topk]:
-            payload = dict(hit.entity.get("payload") or {})
-            payload["score"] = float(hit.score)
-            results.append(payload)
-        return results
+        batches: List[List[Dict[str, Any]]] = []
+        for hits in res:
+            results: List[Dict[str, Any]] = []
+            for hit in hits[offset:limit]:
+                payload = dict(hit.entity.get("payload") or {})
+                payload["score"] = float(hit.score)
+                results.append(payload)
+            batches.append(results)
+        return batches
 
     def size(self) -> int:
         return int(self.collection.num_entities)
@@ -538,6 +1246,25 @@ def create_vector_store(cfg: Dict[str, Any]) -> BaseVectorStore:
             ef_construction=int(cfg.get("ef_construction", 200)),
             m=int(cfg.get("M", 16)),
             ef_search=int(cfg.get("ef_search", 64)),
+            num_threads=int(cfg.get("num_threads", -1)),
+            save_interval_seconds=float(cfg.get("save_interval_seconds", 30.0)),
+            save_every_batches=int(cfg.get("save_every_batches", 50)),
+            max_query_depth=int(cfg.get("max_query_depth", 2000)),
+        )
+    if store_type == "usearch":
+        return USearchVectorStore(
+            path=cfg.get("path", "./data/index"),
+            dim=int(cfg.get("dim", 768)),
+            max_elements=int(cfg.get("max_elements", 1_500_000)),
+            metric=cfg.get("metric", "cosine"),
+            ef_construction=int(cfg.get("ef_construction", 200)),
+            m=int(cfg.get("M", 16)),
+            ef_search=int(cfg.get("ef_search", 64)),
+            dtype=str(cfg.get("dtype", "f32")),
+            num_threads=int(cfg.get("num_threads", -1)),
+            save_interval_seconds=float(cfg.get("save_interval_seconds", 30.0)),
+            save_every_batches=int(cfg.get("save_every_batches", 50)),
+            max_query_depth=int(cfg.get("max_query_depth", 2000)),
         )
     if store_type == "qdrant":
         return QdrantVectorStore(
@@ -548,6 +1275,13 @@ def create_vector_store(cfg: Dict[str, Any]) -> BaseVectorStore:
             api_key=cfg.get("api_key"),
             timeout=float(cfg.get("timeout_seconds", 60.0)),
             http_timeout=float(cfg.get("http_timeout_seconds", 30.0)),
+            prefer_grpc=bool(cfg.get("prefer_grpc", False)),
+            grpc_port=int(cfg.get("grpc_port", 6334)),
+            upload_batch_size=int(cfg.get("upload_batch_size", 256)),
+            quantization=cfg.get("quantization"),
+            coalesce_ms=float(cfg.get("coalesce_ms", 0.0)),
+            datatype=cfg.get("datatype"),
+            http2=bool(cfg.get("http2", False)),
         )
     if store_type == "milvus":
         return MilvusVectorStore(
@@ -1,10 +1,19 @@
-import json
+import copy
 import os
 import secrets
 import threading
 import time
 import hashlib
-from typing import Any, Dict, List, Optional
+import heapq
+import hmac
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+# scrypt cost for new password hashes (~16 MiB, tens of ms per check).
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
 
 
 class AuthStore:
@@ -21,8 +30,15 @@ class AuthStore:
         self.admin_password = admin_password
         self.token_ttl = int(token_ttl)
         self.token_store_path = token_store_path or os.path.join(os.path.dirname(user_store_path), "tokens.json")
+        # Guards file I/O only; token dict get/set/pop are atomic and stay lock-free.
         self._lock = threading.Lock()
+        # Serializes user-file read-modify-write cycles so concurrent updates are not lost.
+        self._update_lock = threading.Lock()
         self._tokens: Dict[str, Dict[str, Any]] = {}
+        # (expires_at, token) min-heap so pruning only touches expired tokens.
+        self._token_expiry: List[Tuple[int, str]] = []
+        # (st_mtime_ns, parsed user file, users by name); reparsed only when the file changes.
+        self._user_cache: Tuple[int, Dict[str, Any], Dict[str, Dict[str, Any]]] | None = None
         self._ensure_store()
         self._load_tokens()
 
@@ -38,73 +54,154 @@ class AuthStore:
         if not os.path.exists(self.token_store_path):
             self._save_tokens({})
 
-    def _load(self) -> Dict[str, Any]:
+    def _load_indexed(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
         with self._lock:
-            if not os.path.exists(self.user_store_path):
-                return {"users": []}
-            with open(self.user_store_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            try:
+                mtime = os.stat(self.user_store_path).st_mtime_ns
+            except FileNotFoundError:
+                return {"users": []}, {}
+            cache = self._user_cache
+            if cache is not None and cache[0] == mtime:
+                return cache[1], cache[2]
+            with open(self.user_store_path, "rb") as f:
+                data = orjson.loads(f.read())
+            by_name = {user.get("username"): user for user in data.get("users", [])}
+            self._user_cache = (mtime, data, by_name)
+            return data, by_name
+
+    def _load(self) -> Dict[str, Any]:
+        return self._load_indexed()[0]
+
+    def _load_for_update(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        # The cached data is shared with readers; edit a private copy so the cache only
+        # changes once _save has written it to disk. Call with _update_lock held.
+        data = copy.deepcopy(self._load())
+        return data, {user.get("username"): user for user in data.get("users", [])}
 
     def _save(self, data: Dict[str, Any]) -> None:
         with self._lock:
-            with open(self.user_store_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(self.user_store_path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            by_name = {user.get("username"): user for user in data.get("users", [])}
+            self._user_cache = (os.stat(self.user_store_path).st_mtime_ns, data, by_name)
 
     def _load_tokens(self) -> None:
         with self._lock:
             if not os.path.exists(self.token_store_path):
                 self._tokens = {}
                 return
-            with open(self.token_store_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(self.token_store_path, "rb") as f:
+                data = orjson.loads(f.read())
         tokens = {}
         for token, meta in (data or {}).items():
             if isinstance(meta, dict) and meta.get("username") and meta.get("issued_at"):
                 tokens[token] = meta
         self._tokens = tokens
+        self._token_expiry = [(int(meta["issued_at"]) + self.token_ttl, token) for token, meta in tokens.items()]
+        heapq.heapify(self._token_expiry)
         self._prune_tokens(save=True)
 
     def _save_tokens(self, data: Dict[str, Any]) -> None:
+        # Snapshot first: other threads may insert tokens while we serialize.
+        snapshot = dict(data)
         with self._lock:
-            with open(self.token_store_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(self.token_store_path, "wb") as f:
+                f.write(orjson.dumps(snapshot, option=orjson.OPT_INDENT_2))
 
     @staticmethod
-    def _hash_password(password: str, salt: str) -> str:
-        payload = f"{salt}:{password}".encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
+    def _hash_password(
+        password: str,
+        salt: str,
+        algo: str = "scrypt",
+        n: int = SCRYPT_N,
+        r: int = SCRYPT_R,
+        p: int = SCRYPT_P,
+    ) -> str:
+        if algo == "sha256":
+            # Legacy records (no "algo" field) were hashed with a single salted SHA-256.
+            payload = f"{salt}:{password}".encode("utf-8")
+            return hashlib.sha256(payload).hexdigest()
+        return hashlib.scrypt(
+            password.encode("utf-8"), salt=bytes.fromhex(salt), n=n, r=r, p=p, dklen=32
+        ).hex()
+
+    @classmethod
+    def _password_fields(cls, password: str) -> Dict[str, Any]:
+        salt = secrets.token_hex(16)
+        return {
+            "algo": "scrypt",
+            "n": SCRYPT_N,
+            "r": SCRYPT_R,
+            "p": SCRYPT_P,
+            "salt": salt,
+            "password_hash": cls._hash_password(password, salt),
+        }
+
+    @classmethod
+    def _check_password(cls, user: Dict[str, Any], password: str) -> bool:
+        algo = user.get("algo", "sha256")
+        hashed = str(user.get("password_hash", ""))
+        candidate = cls._hash_password(
+            password,
+            user.get("salt", ""),
+            algo=algo,
+            n=int(user.get("n", SCRYPT_N)),
+            r=int(user.get("r", SCRYPT_R)),
+            p=int(user.get("p", SCRYPT_P)),
+        )
+        return hmac.compare_digest(hashed, candidate)
 
     def _prune_tokens(self, save: bool = False) -> None:
         now = int(time.time())
-        expired = [t for t, meta in self._tokens.items() if now - meta["issued_at"] > self.token_ttl]
-        for token in expired:
-            self._tokens.pop(token, None)
+        expiry = self._token_expiry
+        expired = False
+        with self._lock:
+            while expiry and expiry[0][0] < now:
+                _, token = heapq.heappop(expiry)
+                expired = self._tokens.pop(token, None) is not None or expired
         if save and expired:
             self._save_tokens(self._tokens)
 
     def login(self, username: str, password: str) -> Optional[Dict[str, Any]]:
-        if username == self.admin_user and password == self.admin_password:
+        # An unset admin password disables the built-in admin rather than matching "None".
+        if (
+            self.admin_password
+            and username == self.admin_user
+            and hmac.compare_digest(password.encode("utf-8"), str(self.admin_password).encode("utf-8"))
+        ):
             return {"username": username, "role": "admin"}
-        data = self._load()
-        for user in data.get("users", []):
-            if user.get("username") != username:
-                continue
-            salt = user.get("salt", "")
-            hashed = user.get("password_hash", "")
-            if hashed == self._hash_password(password, salt):
-                return {"username": username, "role": user.get("role", "user")}
-        return None
+        user = self._load_indexed()[1].get(username)
+        if user is None or not self._check_password(user, password):
+            return None
+        if user.get("algo", "sha256") != "scrypt":
+            # Upgrade legacy SHA-256 records the first time the password is seen.
+            with self._update_lock:
+                data, by_name = self._load_for_update()
+                stored = by_name.get(username)
+                if stored is not None and stored.get("algo", "sha256") != "scrypt":
+                    stored.update(self._password_fields(password))
+                    self._save(data)
+        return {"username": username, "role": user.get("role", "user")}
 
     def issue_token(self, username: str, role: str) -> str:
         self._prune_tokens()
         token = secrets.token_hex(24)
-        self._tokens[token] = {"username": username, "role": role, "issued_at": int(time.time())}
+        issued_at = int(time.time())
+        self._tokens[token] = {"username": username, "role": role, "issued_at": issued_at}
+        with self._lock:
+            heapq.heappush(self._token_expiry, (issued_at + self.token_ttl, token))
         self._save_tokens(self._tokens)
         return token
 
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
-        self._prune_tokens(save=True)
-        return self._tokens.get(token)
+        # O(1): check only this token's age; the expiry heap is drained when tokens are issued.
+        meta = self._tokens.get(token)
+        if meta is None:
+            return None
+        if int(time.time()) - meta["issued_at"] > self.token_ttl:
+            self._tokens.pop(token, None)
+            return None
+        return meta
 
     def list_users(self) -> List[Dict[str, Any]]:
         data = self._load()
@@ -114,42 +211,29 @@ class AuthStore:
         return users
 
     def add_user(self, username: str, password: str, role: str = "user") -> None:
-        data = self._load()
-        users = data.get("users", [])
-        for user in users:
-            if user.get("username") == username:
+        with self._update_lock:
+            data, by_name = self._load_for_update()
+            users = data.get("users", [])
+            if username in by_name:
                 raise ValueError("User already exists")
-        salt = secrets.token_hex(8)
-        users.append(
-            {
-                "username": username,
-                "role": role,
-                "salt": salt,
-                "password_hash": self._hash_password(password, salt),
-            }
-        )
-        data["users"] = users
-        self._save(data)
+            users.append({"username": username, "role": role, **self._password_fields(password)})
+            data["users"] = users
+            self._save(data)
 
     def update_password(self, username: str, old_password: str, new_password: str) -> None:
-        data = self._load()
-        users = data.get("users", [])
-        for user in users:
-            if user.get("username") != username:
-                continue
-            salt = user.get("salt", "")
-            hashed = user.get("password_hash", "")
-            if hashed != self._hash_password(old_password, salt):
+        with self._update_lock:
+            data, by_name = self._load_for_update()
+            user = by_name.get(username)
+            if user is None:
+                raise ValueError("User not found")
+            if not self._check_password(user, old_password):
                 raise ValueError("Invalid password")
-            new_salt = secrets.token_hex(8)
-            user["salt"] = new_salt
-            user["password_hash"] = self._hash_password(new_password, new_salt)
+            user.update(self._password_fields(new_password))
             self._save(data)
-            return
-        raise ValueError("User not found")
 
     def delete_user(self, username: str) -> None:
-        data = self._load()
-        users = [u for u in data.get("users", []) if u.get("username") != username]
-        data["users"] = users
-        self._save(data)
+        with self._update_lock:
+            data = self._load_for_update()[0]
+            users = [u for u in data.get("users", []) if u.get("username") != username]
+            data["users"] = users
+            self._save(data)
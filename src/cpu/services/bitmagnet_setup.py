@@ -6,10 +6,233 @@ import psycopg
 from psycopg import sql
 
 from cpu.config import load_config
+from cpu.repositories.pg import NORM_SEARCH_FUNCTION_SQL
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
+# Statement templates are parsed once at import; helpers only bind the schema identifier.
+TORRENT_FILES_VIEW_SQL = sql.SQL(
+    """
+    CREATE OR REPLACE VIEW {schema}.torrent_files_view AS
+    SELECT
+        (encode(info_hash, 'hex') || ':' || index::text) AS file_id,
+        info_hash,
+        index,
+        path,
+        extension,
+        size,
+        created_at,
+        updated_at
+    FROM public.torrent_files
+    """
+)
+
+CONTENT_VIEW_SQL = sql.SQL(
+    """
+    CREATE {kind} {schema}.content_view AS
+    SELECT
+        (c.type || ':' || c.source || ':' || c.id) AS content_uid,
+        c.type,
+        c.source,
+        c.id,
+        c.title,
+        c.original_title,
+        c.overview,
+        c.adult,
+        c.release_year,
+        c.updated_at,
+        CASE WHEN c.source = 'tmdb' THEN c.id ELSE NULL END AS tmdb_id,
+        te.genre AS genre,
+        te.keywords AS keywords,
+        trim(both ' ' from concat_ws(' ',
+            c.title,
+            c.original_title,
+            c.overview,
+            c.release_year::text,
+            ccn.collection_names,
+            CASE WHEN c.source = 'tmdb' THEN c.id ELSE NULL END,
+            -- An empty blob stands for all-NULL parts, which concat_ws skipped one by one.
+            NULLIF(te.search_blob, ''),
+            NULLIF(je.search_blob, '')
+        )) AS search_text,
+        te.aka AS aka,
+        te.actors AS actors,
+        te.directors AS directors,
+        te.plot AS plot,
+        te.imdb_id AS imdb_id,
+        te.imdb_rating AS imdb_rating,
+        te.douban_rating AS douban_rating,
+        te.poster_path AS poster_path,
+        te.backdrop_path AS backdrop_path,
+        je.tpdb_id AS tpdb_id,
+        je.title AS tpdb_title,
+        je.original_title AS tpdb_original_title,
+        je.aka AS tpdb_aka,
+        je.actors AS tpdb_actors,
+        je.tags AS tpdb_tags,
+        je.studio AS tpdb_studio,
+        je.series AS tpdb_series,
+        je.site AS tpdb_site,
+        je.release_date AS tpdb_release_date,
+        je.plot AS tpdb_plot,
+        je.poster_url AS tpdb_poster_url
+    FROM public.content c
+    -- Aggregate collection names per content row before joining, so the view needs no
+    -- GROUP BY over every output column and filters on c.* still reach the content table.
+    LEFT JOIN LATERAL (
+        SELECT string_agg(DISTINCT cc.name, ' ') FILTER (WHERE cc.name IS NOT NULL) AS collection_names
+        FROM public.content_collections_content ccc
+        JOIN public.content_collections cc
+            ON cc.type = ccc.content_collection_type
+            AND cc.source = ccc.content_collection_source
+            AND cc.id = ccc.content_collection_id
+        WHERE ccc.content_type = c.type
+            AND ccc.content_source = c.source
+            AND ccc.content_id = c.id
+    ) ccn ON true
+    LEFT JOIN {schema}.tmdb_enrichment te
+        ON te.content_type = c.type
+        AND te.tmdb_id = c.id
+        AND c.source = 'tmdb'
+    LEFT JOIN {schema}.tpdb_enrichment je
+        ON je.content_type = c.type
+        AND je.content_source = c.source
+        AND je.content_id = c.id
+    """
+)
+
+# content_view may exist as a plain or a materialized view; each kind has its own DROP.
+DROP_CONTENT_VIEW_SQL = sql.SQL(
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_matviews WHERE schemaname = {schema} AND matviewname = 'content_view') THEN
+            EXECUTE format('DROP MATERIALIZED VIEW %I.content_view', {schema});
+        ELSE
+            EXECUTE format('DROP VIEW IF EXISTS %I.content_view', {schema});
+        END IF;
+    END
+    $$
+    """
+)
+
+# Indexes for the materialized content_view (content_uid is required by REFRESH CONCURRENTLY).
+CONTENT_VIEW_INDEX_SQL = [
+    sql.SQL("CREATE UNIQUE INDEX content_view_uid_idx ON {schema}.content_view (content_uid)"),
+    sql.SQL("CREATE INDEX content_view_updated_at_idx ON {schema}.content_view (updated_at)"),
+]
+
+# concat_ws is only STABLE, so generated columns join their parts through this wrapper.
+# Same result as concat_ws(' ', ...): NULLs are skipped and all-NULL input gives ''.
+# pg_trgm indexes for TMDB query expansion (bitmagnet.trgm_indexes). An interrupted CONCURRENTLY
+# build leaves an INVALID index that IF NOT EXISTS then skips; drop it and re-run setup.
+TRGM_INDEX_SQL = [
+    sql.SQL(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tmdb_enrichment_aka_trgm "
+        "ON {schema}.tmdb_enrichment USING gin (aka gin_trgm_ops)"
+    ),
+    sql.SQL(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tmdb_enrichment_keywords_trgm "
+        "ON {schema}.tmdb_enrichment USING gin (keywords gin_trgm_ops)"
+    ),
+    sql.SQL("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_title_trgm ON public.content USING gin (title gin_trgm_ops)"),
+    sql.SQL(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_original_title_trgm "
+        "ON public.content USING gin (original_title gin_trgm_ops)"
+    ),
+]
+
+SEARCH_BLOB_FUNCTION_SQL = sql.SQL(
+    "CREATE OR REPLACE FUNCTION {schema}.search_blob(VARIADIC text[]) RETURNS text "
+    "AS $$ SELECT COALESCE(array_to_string($1, ' '), '') $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE"
+)
+
+# Enrichment fields folded into content_view.search_text, in the order they are concatenated.
+TMDB_SEARCH_BLOB_SQL = sql.SQL("{schema}.search_blob(aka, keywords, actors, directors, plot, genre)")
+TPDB_SEARCH_BLOB_SQL = sql.SQL(
+    "{schema}.search_blob(title, original_title, aka, actors, tags, studio, series, site, release_date, plot)"
+)
+
+TMDB_TABLE_SQL = sql.SQL(
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.tmdb_enrichment (
+        content_type TEXT NOT NULL,
+        tmdb_id TEXT NOT NULL,
+        imdb_id TEXT,
+        aka TEXT,
+        keywords TEXT,
+        actors TEXT,
+        directors TEXT,
+        plot TEXT,
+        genre TEXT,
+        imdb_rating DOUBLE PRECISION,
+        douban_rating DOUBLE PRECISION,
+        raw JSONB,
+        poster_path TEXT GENERATED ALWAYS AS (raw->>'poster_path') STORED,
+        backdrop_path TEXT GENERATED ALWAYS AS (raw->>'backdrop_path') STORED,
+        search_blob TEXT GENERATED ALWAYS AS ({search_blob}) STORED,
+        updated_at TIMESTAMPTZ DEFAULT now(),
+        PRIMARY KEY (content_type, tmdb_id)
+    );
+    """
+)
+
+TMDB_COLUMNS_SQL = sql.SQL(
+    """
+    ALTER TABLE {schema}.tmdb_enrichment
+        ADD COLUMN IF NOT EXISTS imdb_id TEXT,
+        ADD COLUMN IF NOT EXISTS imdb_rating DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS douban_rating DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS poster_path TEXT GENERATED ALWAYS AS (raw->>'poster_path') STORED,
+        ADD COLUMN IF NOT EXISTS backdrop_path TEXT GENERATED ALWAYS AS (raw->>'backdrop_path') STORED,
+        ADD COLUMN IF NOT EXISTS search_blob TEXT GENERATED ALWAYS AS ({search_blob}) STORED;
+    """
+)
+
+TPDB_TABLE_SQL = sql.SQL(
+    """
+    CREATE TABLE IF NOT EXISTS {schema}.tpdb_enrichment (
+        content_type TEXT NOT NULL,
+        content_source TEXT NOT NULL,
+        content_id TEXT NOT NULL,
+        tpdb_id TEXT,
+        external_type TEXT,
+        title TEXT,
+        original_title TEXT,
+        aka TEXT,
+        actors TEXT,
+        tags TEXT,
+        studio TEXT,
+        series TEXT,
+        site TEXT,
+        release_date TEXT,
+        plot TEXT,
+        poster_url TEXT,
+        match_method TEXT,
+        match_score DOUBLE PRECISION,
+        status TEXT,
+        error_message TEXT,
+        raw JSONB,
+        search_blob TEXT GENERATED ALWAYS AS ({search_blob}) STORED,
+        updated_at TIMESTAMPTZ DEFAULT now(),
+        PRIMARY KEY (content_type, content_source, content_id)
+    );
+    """
+)
+
+TPDB_COLUMNS_SQL = sql.SQL(
+    """
+    ALTER TABLE {schema}.tpdb_enrichment
+        ADD COLUMN IF NOT EXISTS search_blob TEXT GENERATED ALWAYS AS ({search_blob}) STORED;
+    """
+)
+
+TPDB_INDEX_SQL = sql.SQL(
+    "CREATE INDEX IF NOT EXISTS tpdb_enrichment_tpdb_id_idx ON {schema}.tpdb_enrichment (tpdb_id)"
+)
+
 
 def build_dsn(cfg: Dict[str, Any]) -> str:
     dsn = cfg.get("dsn")
@@ -41,217 +264,82 @@ def ensure_schema(conn: psycopg.Connection, schema: str, create_schema: bool) ->
 
 
 def create_torrent_files_view(conn: psycopg.Connection, schema: str) -> None:
-    view_sql = sql.SQL(
-        """
-        CREATE OR REPLACE VIEW {schema}.torrent_files_view AS
-        SELECT
-            (encode(info_hash, 'hex') || ':' || index::text) AS file_id,
-            info_hash,
-            index,
-            path,
-            extension,
-            size,
-            created_at,
-            updated_at
-        FROM public.torrent_files
-        """
-    ).format(schema=sql.Identifier(schema))
+    view_sql = TORRENT_FILES_VIEW_SQL.format(schema=sql.Identifier(schema))
     with conn.cursor() as cur:
         cur.execute(view_sql)
 
 
-def create_content_view(conn: psycopg.Connection, schema: str) -> None:
-    view_sql = sql.SQL(
-        """
-        CREATE OR REPLACE VIEW {schema}.content_view AS
-        SELECT
-            (c.type || ':' || c.source || ':' || c.id) AS content_uid,
-            c.type,
-            c.source,
-            c.id,
-            c.title,
-            c.original_title,
-            c.overview,
-            c.adult,
-            c.release_year,
-            c.updated_at,
-            CASE WHEN c.source = 'tmdb' THEN c.id ELSE NULL END AS tmdb_id,
-            te.genre AS genre,
-            te.keywords AS keywords,
-            trim(both ' ' from concat_ws(' ',
-                c.title,
-                c.original_title,
-                c.overview,
-                c.release_year::text,
-                string_agg(DISTINCT cc.name, ' ') FILTER (WHERE cc.name IS NOT NULL),
-                CASE WHEN c.source = 'tmdb' THEN c.id ELSE NULL END,
-                te.aka,
-                te.keywords,
-                te.actors,
-                te.directors,
-                te.plot,
-                te.genre,
-                je.title,
-                je.original_title,
-                je.aka,
-                je.actors,
-                je.tags,
-                je.studio,
-                je.series,
-                je.site,
-                je.release_date,
-                je.plot
-            )) AS search_text,
-            te.aka AS aka,
-            te.actors AS actors,
-            te.directors AS directors,
-            te.plot AS plot,
-            te.imdb_id AS imdb_id,
-            te.imdb_rating AS imdb_rating,
-            te.douban_rating AS douban_rating,
-            te.raw->>'poster_path' AS poster_path,
-            te.raw->>'backdrop_path' AS backdrop_path,
-            je.tpdb_id AS tpdb_id,
-            je.title AS tpdb_title,
-            je.original_title AS tpdb_original_title,
-            je.aka AS tpdb_aka,
-            je.actors AS tpdb_actors,
-            je.tags AS tpdb_tags,
-            je.studio AS tpdb_studio,
-            je.series AS tpdb_series,
-            je.site AS tpdb_site,
-            je.release_date AS tpdb_release_date,
-            je.plot AS tpdb_plot,
-            je.poster_url AS tpdb_poster_url
-        FROM public.content c
-        LEFT JOIN public.content_collections_content ccc
-            ON ccc.content_type = c.type
-            AND ccc.content_source = c.source
-            AND ccc.content_id = c.id
-        LEFT JOIN public.content_collections cc
-            ON cc.type = ccc.content_collection_type
-            AND cc.source = ccc.content_collection_source
-            AND cc.id = ccc.content_collection_id
-        LEFT JOIN {schema}.tmdb_enrichment te
-            ON te.content_type = c.type
-            AND te.tmdb_id = c.id
-            AND c.source = 'tmdb'
-        LEFT JOIN {schema}.tpdb_enrichment je
-            ON je.content_type = c.type
-            AND je.content_source = c.source
-            AND je.content_id = c.id
-        GROUP BY
-            c.type,
-            c.source,
-            c.id,
-            c.title,
-            c.original_title,
-            c.overview,
-            c.adult,
-            c.release_year,
-            c.updated_at,
-            te.genre,
-            te.keywords,
-            te.aka,
-            te.actors,
-            te.directors,
-            te.plot,
-            te.imdb_id,
-            te.imdb_rating,
-            te.douban_rating,
-            te.raw->>'poster_path',
-            te.raw->>'backdrop_path',
-            je.tpdb_id,
-            je.title,
-            je.original_title,
-            je.aka,
-            je.actors,
-            je.tags,
-            je.studio,
-            je.series,
-            je.site,
-            je.release_date,
-            je.plot,
-            je.poster_url
-        """
-    ).format(schema=sql.Identifier(schema))
+def create_content_view(conn: psycopg.Connection, schema: str, materialized: bool = False) -> None:
+    """(Re)create ``content_view``.
+
+    With ``materialized=True`` the joins and collection aggregation run once per refresh
+    instead of on every read, and the result gets indexes on content_uid (required for
+    REFRESH ... CONCURRENTLY) and updated_at (incremental sync ordering). Reads then lag
+    the base tables until run_sync refreshes it (PGClient.refresh_materialized_view).
+    """
+    view_sql = CONTENT_VIEW_SQL.format(
+        kind=sql.SQL("MATERIALIZED VIEW" if materialized else "VIEW"),
+        schema=sql.Identifier(schema),
+    )
     with conn.cursor() as cur:
-        cur.execute(sql.SQL("DROP VIEW IF EXISTS {schema}.content_view").format(schema=sql.Identifier(schema)))
+        # One server-side statement (no relkind round trip) keeps setup's DDL pipeline flowing.
+        cur.execute(DROP_CONTENT_VIEW_SQL.format(schema=sql.Literal(schema)))
         cur.execute(view_sql)
+        if materialized:
+            for statement in CONTENT_VIEW_INDEX_SQL:
+                cur.execute(statement.format(schema=sql.Identifier(schema)))
+
+
+def ensure_search_blob_function(conn: psycopg.Connection, schema: str) -> None:
+    with conn.cursor() as cur:
+        cur.execute(SEARCH_BLOB_FUNCTION_SQL.format(schema=sql.Identifier(schema)))
 
 
 def ensure_tmdb_table(conn: psycopg.Connection, schema: str) -> None:
-    table_sql = sql.SQL(
-        """
-        CREATE TABLE IF NOT EXISTS {schema}.tmdb_enrichment (
-            content_type TEXT NOT NULL,
-            tmdb_id TEXT NOT NULL,
-            imdb_id TEXT,
-            aka TEXT,
-            keywords TEXT,
-            actors TEXT,
-            directors TEXT,
-            plot TEXT,
-            genre TEXT,
-            imdb_rating DOUBLE PRECISION,
-            douban_rating DOUBLE PRECISION,
-            raw JSONB,
-            updated_at TIMESTAMPTZ DEFAULT now(),
-            PRIMARY KEY (content_type, tmdb_id)
-        );
-        """
-    ).format(schema=sql.Identifier(schema))
+    ident = sql.Identifier(schema)
+    table_sql = TMDB_TABLE_SQL.format(schema=ident, search_blob=TMDB_SEARCH_BLOB_SQL.format(schema=ident))
+    ensure_search_blob_function(conn, schema)
     with conn.cursor() as cur:
         cur.execute(table_sql)
 
 
 def ensure_tmdb_columns(conn: psycopg.Connection, schema: str) -> None:
-    alter_sql = sql.SQL(
-        """
-        ALTER TABLE {schema}.tmdb_enrichment
-            ADD COLUMN IF NOT EXISTS imdb_id TEXT,
-            ADD COLUMN IF NOT EXISTS imdb_rating DOUBLE PRECISION,
-            ADD COLUMN IF NOT EXISTS douban_rating DOUBLE PRECISION;
-        """
-    ).format(schema=sql.Identifier(schema))
+    ident = sql.Identifier(schema)
+    alter_sql = TMDB_COLUMNS_SQL.format(schema=ident, search_blob=TMDB_SEARCH_BLOB_SQL.format(schema=ident))
     with conn.cursor() as cur:
         cur.execute(alter_sql)
 
 
 def ensure_tpdb_table(conn: psycopg.Connection, schema: str) -> None:
-    table_sql = sql.SQL(
-        """
-        CREATE TABLE IF NOT EXISTS {schema}.tpdb_enrichment (
-            content_type TEXT NOT NULL,
-            content_source TEXT NOT NULL,
-            content_id TEXT NOT NULL,
-            tpdb_id TEXT,
-            external_type TEXT,
-            title TEXT,
-            original_title TEXT,
-            aka TEXT,
-            actors TEXT,
-            tags TEXT,
-            studio TEXT,
-            series TEXT,
-            site TEXT,
-            release_date TEXT,
-            plot TEXT,
-            poster_url TEXT,
-            match_method TEXT,
-            match_score DOUBLE PRECISION,
-            status TEXT,
-            error_message TEXT,
-            raw JSONB,
-            updated_at TIMESTAMPTZ DEFAULT now(),
-            PRIMARY KEY (content_type, content_source, content_id)
-        );
-        CREATE INDEX IF NOT EXISTS tpdb_enrichment_tpdb_id_idx
-            ON {schema}.tpdb_enrichment (tpdb_id);
-        """
-    ).format(schema=sql.Identifier(schema))
+    ident = sql.Identifier(schema)
+    search_blob = TPDB_SEARCH_BLOB_SQL.format(schema=ident)
+    # Separate statements: pipeline mode (setup_bitmagnet) rejects multi-statement strings.
+    statements = [
+        TPDB_TABLE_SQL.format(schema=ident, search_blob=search_blob),
+        TPDB_COLUMNS_SQL.format(schema=ident, search_blob=search_blob),
+        TPDB_INDEX_SQL.format(schema=ident),
+    ]
+    ensure_search_blob_function(conn, schema)
     with conn.cursor() as cur:
-        cur.execute(table_sql)
+        for statement in statements:
+            cur.execute(statement)
+
+
+def ensure_trgm_indexes(conn: psycopg.Connection, schema: str) -> None:
+    """Create the pg_trgm indexes used by search_tmdb_expansions' ILIKE predicates.
+
+    Built CONCURRENTLY (so outside the DDL pipeline) because public.content belongs to
+    bitmagnet, which keeps writing to it. A failed index is logged and skipped.
+    """
+    statements = [sql.SQL("CREATE EXTENSION IF NOT EXISTS pg_trgm")]
+    statements.extend(statement.format(schema=sql.Identifier(schema)) for statement in TRGM_INDEX_SQL)
+    with conn.cursor() as cur:
+        for statement in statements:
+            try:
+                cur.execute(statement)
+            except psycopg.Error as exc:
+                # e.g. not the owner of public.content; the rest of the setup still applies.
+                logger.warning("Skip trgm index error=%s", exc)
 
 
 def setup_bitmagnet(config_path: str) -> None:
@@ -262,14 +350,22 @@ def setup_bitmagnet(config_path: str) -> None:
         return
     schema = bm_cfg.get("schema", "hermes")
     create_schema = bool(bm_cfg.get("create_schema", True))
+    materialized = bool(bm_cfg.get("materialize_content_view", False))
     dsn = build_dsn(bm_cfg)
     with psycopg.connect(dsn, autocommit=True) as conn:
         ensure_schema(conn, schema, create_schema)
-        ensure_tmdb_table(conn, schema)
-        ensure_tmdb_columns(conn, schema)
-        ensure_tpdb_table(conn, schema)
-        create_torrent_files_view(conn, schema)
-        create_content_view(conn, schema)
+        # Pipeline mode sends the idempotent DDL back-to-back instead of one round trip each;
+        # none of these helpers fetch results, so nothing forces a sync until the block exits.
+        with conn.pipeline():
+            ensure_tmdb_table(conn, schema)
+            ensure_tmdb_columns(conn, schema)
+            ensure_tpdb_table(conn, schema)
+            create_torrent_files_view(conn, schema)
+            create_content_view(conn, schema, materialized=materialized)
+            # Keyword search only probes for norm_search(); it is installed here and in ensure_tables.
+            conn.execute(NORM_SEARCH_FUNCTION_SQL)
+        if bm_cfg.get("trgm_indexes", False):
+            ensure_trgm_indexes(conn, schema)
     logger.info("bitmagnet views created in schema=%s", schema)
 
 
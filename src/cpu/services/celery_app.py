@@ -8,16 +8,103 @@ Notes:
   - Default beat schedule uses config.celery.schedule_seconds; adjust per source if needed.
   - For file-based HNSW index, prefer single worker/concurrency=1 to avoid concurrent writes.
 """
+import contextlib
 import os
+import threading
 from datetime import timedelta
+from typing import Any, Dict, Iterator
 
 from celery import Celery
 
-from cpu.config import load_config
-from cpu.services.sync_runner import run_sync
+from cpu.config import Config, load_config
+from cpu.repositories.vector_store import create_vector_store
+from cpu.services.sync_runner import create_gpu_client, create_pg_client, run_sync
 
 CONFIG_PATH = os.getenv("CONFIG_PATH", "configs/example.yaml")
 cfg = load_config(CONFIG_PATH)
+_cfg_mtime_ns = os.stat(CONFIG_PATH).st_mtime_ns
+_cfg_lock = threading.Lock()
+
+
+def current_config() -> Config:
+    """Parsed config, re-read only when the YAML file changes (not once per task)."""
+    global cfg, _cfg_mtime_ns
+    mtime_ns = os.stat(CONFIG_PATH).st_mtime_ns
+    if mtime_ns != _cfg_mtime_ns:
+        with _cfg_lock:
+            if mtime_ns != _cfg_mtime_ns:
+                cfg = load_config(CONFIG_PATH)
+                _cfg_mtime_ns = mtime_ns
+    return cfg
+
+
+# Clients kept for the life of the worker process (PG pool, GPU HTTP client, loaded index),
+# rebuilt only when current_config() returns a reloaded Config.
+class _ClientSet:
+    def __init__(self, config: Config, previous: "_ClientSet | None" = None) -> None:
+        self.config = config
+        # Keep one store per index: a second HNSW store on the same files, with its own lock,
+        # would overwrite whatever the other one saved.
+        reuse_store = previous is not None and previous.config.vector_store == config.vector_store
+        if reuse_store:
+            vector_store = previous.clients["vector_store"]
+        else:
+            vector_store = create_vector_store(config.vector_store)
+        self.clients: Dict[str, Any] = {
+            "pg_client": create_pg_client(config),
+            "gpu_client": create_gpu_client(config),
+            "vector_store": vector_store,
+        }
+        self.owns_store = True
+        if reuse_store:
+            previous.owns_store = False
+        # Tasks currently running with these clients; a replaced set closes when it hits 0.
+        self.users = 0
+        self.retired = False
+
+    def close(self) -> None:
+        try:
+            if self.owns_store:
+                store = self.clients["vector_store"]
+                store.flush()
+                if hasattr(store, "close"):
+                    store.close()
+        finally:
+            gpu_client = self.clients["gpu_client"]
+            if hasattr(gpu_client, "close"):
+                gpu_client.close()
+            self.clients["pg_client"].close()
+
+
+_client_set: _ClientSet | None = None
+
+
+@contextlib.contextmanager
+def sync_clients(config: Config) -> Iterator[Dict[str, Any]]:
+    """Lend the cached clients for one task; clients from an older config close once unused."""
+    global _client_set
+    stale = None
+    with _cfg_lock:
+        if _client_set is None or _client_set.config is not config:
+            previous = _client_set
+            _client_set = _ClientSet(config, previous)
+            if previous is not None:
+                previous.retired = True
+                if previous.users == 0:
+                    stale = previous
+        client_set = _client_set
+        client_set.users += 1
+    if stale is not None:
+        stale.close()
+    try:
+        yield dict(client_set.clients)
+    finally:
+        with _cfg_lock:
+            client_set.users -= 1
+            done = client_set.retired and client_set.users == 0
+        if done:
+            client_set.close()
+
 
 celery_app = Celery(
     "hermes_sync",
@@ -28,13 +115,17 @@ celery_app = Celery(
 
 @celery_app.task
 def sync_all_sources() -> str:
-    run_sync(CONFIG_PATH)
+    config = current_config()
+    with sync_clients(config) as clients:
+        run_sync(CONFIG_PATH, cfg=config, **clients)
     return "ok"
 
 
 @celery_app.task
 def sync_source(source_name: str) -> str:
-    run_sync(CONFIG_PATH, source_name)
+    config = current_config()
+    with sync_clients(config) as clients:
+        run_sync(CONFIG_PATH, source_name, cfg=config, **clients)
     return f"ok:{source_name}"
 
 
@@ -9,7 +9,7 @@ import numpy as np
 from psycopg import sql
 
 from cpu.clients.gpu_client import GPUClient
-from cpu.config import load_config, source_batch_size, source_concurrency
+from cpu.config import Config, load_config, source_batch_size, source_concurrency
 from cpu.core.utils import normalize_title_text, text_hash
 from cpu.repositories.pg import PGClient
 from cpu.repositories.vector_store import BaseVectorStore, create_vector_store
@@ -280,7 +280,7 @@ def sync_source(
                                     (content_type, content_source, content_ids),
                                 )
                                 for row in cur.fetchall():
-                                    tpdb_rows_by_key[str(row["content_id"])] = dict(row)
+                                    tpdb_rows_by_key[str(row["content_id"])] = row
                 except Exception as exc:
                     logger.warning("Failed to load TPDB fields for source=%s error=%s", source["name"], exc)
 
@@ -390,8 +390,7 @@ def sync_source(
             infer_cost = time.perf_counter() - infer_start
         except Exception as exc:
             logger.exception("GPU inference failed: %s", exc)
-            for r in rows_to_embed:
-                pg_client.mark_failure(source["name"], str(r["pg_id"]), str(exc))
+            pg_client.mark_failures([(source["name"], str(r["pg_id"]), str(exc)) for r in rows_to_embed])
             raise
         if embeddings.shape[1] != vector_store.dim:
             raise ValueError(
@@ -399,8 +398,19 @@ def sync_source(
             )
         metas: List[Dict[str, Any]] = []
         updates: List[Dict[str, Any]] = []
-        for row, score in zip(rows_to_embed, scores):
-            nsfw_flag = score >= nsfw_threshold if source.get("tagging", {}).get("nsfw", True) else False
+        # Threshold and unbox the whole score vector once instead of per row. float64 round-trips
+        # the GPU service's scores exactly, so stored nsfw_score values stay as received.
+        score_arr = np.asarray(scores, dtype=np.float64)
+        if source.get("tagging", {}).get("nsfw", True):
+            nsfw_flags = (score_arr >= nsfw_threshold).tolist()
+        else:
+            nsfw_flags = [False] * len(score_arr)
+        score_values = score_arr.tolist()
+        source_name = source["name"]
+        size_field = (source.get("pg") or {}).get("size_field", "size")
+        for row, score, nsfw_flag in zip(rows_to_embed, score_values, nsfw_flags):
+            pg_id = str(row["pg_id"])
+            row_hash = row.get("text_hash") or text_hash(row["text"])
             tmdb_id = row.get("tmdb_id")
             has_tmdb = bool(tmdb_id)
             tpdb_id = row.get("tpdb_id")
@@ -409,7 +419,6 @@ def sync_source(
             extension = row.get("extension") or _extract_extension(str(row.get("text", "")))
             file_type = _detect_file_type(str(extension))
             audio_langs, subtitle_langs = _detect_languages(str(row.get("text", "")))
-            size_field = (source.get("pg") or {}).get("size_field", "size")
             size_value = None
             if size_field:
                 raw_size = row.get(size_field)
@@ -421,11 +430,11 @@ def sync_source(
                     size_value = size_num
             metas.append(
                 {
-                    "source": source["name"],
-                    "pg_id": str(row["pg_id"]),
+                    "source": source_name,
+                    "pg_id": pg_id,
                     "nsfw": nsfw_flag,
-                    "nsfw_score": float(score),
-                    "text_hash": row.get("text_hash") or text_hash(row["text"]),
+                    "nsfw_score": score,
+                    "text_hash": row_hash,
                     "embedding_version": embedding_version,
                     "has_tmdb": has_tmdb,
                     "tmdb_id": str(tmdb_id) if tmdb_id is not None else None,
@@ -440,10 +449,10 @@ def sync_source(
             )
             updates.append(
                 {
-                    "pg_id": str(row["pg_id"]),
-                    "text_hash": row.get("text_hash") or text_hash(row["text"]),
+                    "pg_id": pg_id,
+                    "text_hash": row_hash,
                     "embedding_version": embedding_version,
-                    "nsfw_score": float(score),
+                    "nsfw_score": score,
                 }
             )
         add_start = time.perf_counter()
@@ -520,11 +529,10 @@ def sync_source(
         futures: Dict[Any, List[str]] = {}
         while True:
             drain_completed(block=False)
-            if len(futures) >= concurrency:
-                drain_completed(block=True)
-                continue
+            # In-flight rows stay pending until their batch upserts sync_state, and they sort
+            # first, so over-fetch by their count to get a full batch of new rows behind them.
             fetch_start = time.perf_counter()
-            rows = pg_client.fetch_pending(source, batch_size=batch_size)
+            rows = pg_client.fetch_pending(source, batch_size=batch_size + len(in_flight))
             fetch_cost = time.perf_counter() - fetch_start
             if not rows:
                 drain_completed(block=True)
@@ -532,7 +540,7 @@ def sync_source(
                     logger.info("No pending rows for source=%s", source["name"])
                     break
                 continue
-            filtered = [r for r in rows if str(r["pg_id"]) not in in_flight]
+            filtered = [r for r in rows if str(r["pg_id"]) not in in_flight][:batch_size]
             if not filtered:
                 logger.info(
                     "Fetched pending rows=%d for source=%s cost=%.3fs skipped_inflight=%d",
@@ -552,6 +560,9 @@ def sync_source(
                 source["name"],
                 fetch_cost,
             )
+            # The next batch is fetched while the previous ones infer; only now wait for a slot.
+            if len(futures) >= concurrency:
+                drain_completed(block=True)
             batch_ids = [str(r["pg_id"]) for r in filtered]
             for pg_id in batch_ids:
                 in_flight.add(pg_id)
@@ -570,26 +581,84 @@ def sync_source(
         )
 
 
-def run_sync(config_path: str, target_source: str | None = None) -> None:
-    cfg = load_config(config_path)
-    pg_client = PGClient(cfg.postgres["dsn"])
-    pg_client.ensure_tables()
-    vector_store = create_vector_store(cfg.vector_store)
+def create_pg_client(cfg: Config) -> PGClient:
+    return PGClient(
+        cfg.postgres["dsn"],
+        min_size=int(cfg.postgres.get("pool_min_size", 2)),
+        max_size=int(cfg.postgres.get("pool_max_size", 16)),
+    )
+
+
+def create_gpu_client(cfg: Config) -> GPUClient:
     search_cfg = getattr(cfg, "search", {}) if hasattr(cfg, "search") else {}
     try:
         gpu_timeout = float((search_cfg or {}).get("gpu_timeout_seconds") or 60.0)
     except (TypeError, ValueError):
         gpu_timeout = 60.0
-    gpu_client = GPUClient(cfg.gpu_endpoint, timeout=gpu_timeout)
+    return GPUClient(cfg.gpu_endpoint, timeout=gpu_timeout)
+
+
+def requeue_unpersisted(pg_client: PGClient, vector_store: BaseVectorStore) -> None:
+    """Re-queue rows whose vectors a crash lost after sync_state already marked them synced."""
+    keys = vector_store.unpersisted_keys()
+    if not keys:
+        return
+    by_source: Dict[str, List[str]] = {}
+    for source_name, pg_id in keys:
+        by_source.setdefault(source_name, []).append(pg_id)
+    for source_name, pg_ids in by_source.items():
+        pg_client.requeue_sync_state(source_name, pg_ids)
+    vector_store.clear_unpersisted(keys)
+    logger.warning("Re-queued rows=%d whose vectors were not saved before the last shutdown", len(keys))
+
+
+def run_sync(
+    config_path: str | None = None,
+    target_source: str | None = None,
+    cfg: Config | None = None,
+    pg_client: PGClient | None = None,
+    gpu_client: GPUClient | None = None,
+    vector_store: BaseVectorStore | None = None,
+) -> None:
+    """Sync every source (or only ``target_source``).
+
+    Pass ``cfg`` to skip re-reading the YAML, and long-lived clients/stores (e.g. per Celery
+    worker) to reuse them across runs; only clients created here are closed at the end.
+    """
+    if cfg is None:
+        cfg = load_config(config_path)
+    owns_pg_client = pg_client is None
+    if pg_client is None:
+        pg_client = create_pg_client(cfg)
+    pg_client.ensure_tables(concurrently=bool(cfg.sync.get("create_indexes_concurrently", False)))
+    for source in cfg.sources:
+        pg_cfg = source.get("pg", {})
+        if pg_cfg.get("keyword_search") and pg_cfg.get("keyword_index"):
+            pg_client.ensure_search_indexes(
+                pg_cfg["table"],
+                pg_cfg.get("keyword_fields") or [pg_cfg["text_field"]],
+            )
+    if vector_store is None:
+        vector_store = create_vector_store(cfg.vector_store)
+    requeue_unpersisted(pg_client, vector_store)
+    if gpu_client is None:
+        gpu_client = create_gpu_client(cfg)
     tmdb_schema = (cfg.bitmagnet or {}).get("schema", "hermes")
     tpdb_schema = (cfg.bitmagnet or {}).get("schema", "hermes")
     sources = [s for s in cfg.sources if (not target_source or s["name"] == target_source)]
     if not sources:
         logger.warning("No sources matched for sync (target=%s)", target_source)
+        if owns_pg_client:
+            pg_client.close()
         return
-    for source in sources:
-        batch_size = source_batch_size(source, cfg.sync)
-        concurrency = source_concurrency(source, cfg.sync)
+    # Materialized source views (bitmagnet.materialize_content_view) only see base-table
+    # changes after a refresh; do it once per run, not per source sharing the view.
+    for table in dict.fromkeys(s["pg"]["table"] for s in sources):
+        refresh_start = time.perf_counter()
+        if pg_client.refresh_materialized_view(table):
+            logger.info("Refreshed materialized view=%s cost=%.3fs", table, time.perf_counter() - refresh_start)
+
+    def run_source(source: Dict[str, Any]) -> None:
         sync_source(
             source,
             vector_store,
@@ -597,14 +666,33 @@ def run_sync(config_path: str, target_source: str | None = None) -> None:
             gpu_client,
             cfg.embedding_model_version,
             cfg.nsfw_threshold,
-            batch_size,
-            concurrency,
+            source_batch_size(source, cfg.sync),
+            source_concurrency(source, cfg.sync),
             cfg.tmdb,
             tmdb_schema,
             cfg.tpdb,
             tpdb_schema,
         )
 
+    # Sources mostly wait on GPU inference, so several can overlap. Stores serialize their own
+    # writes (HNSW adds take the store lock), but each source adds its own batch workers, so
+    # keep pool_max_size >= sum of source concurrency.
+    max_parallel = max(1, min(len(sources), int(cfg.sync.get("max_parallel_sources", 1) or 1)))
+    try:
+        if max_parallel == 1:
+            for source in sources:
+                run_source(source)
+        else:
+            with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+                for future in [executor.submit(run_source, source) for source in sources]:
+                    future.result()
+    finally:
+        try:
+            vector_store.flush()
+        finally:
+            if owns_pg_client:
+                pg_client.close()
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="HermesIndex sync runner")
@@ -1,4 +1,5 @@
 import argparse
+import functools
 import json
 import logging
 import os
@@ -24,6 +25,33 @@ TMDB_TYPES = {
     "tv": "tv",
 }
 
+TMDB_UPSERT_SQL = sql.SQL(
+    """
+    INSERT INTO {schema}.tmdb_enrichment
+        (content_type, tmdb_id, imdb_id, aka, keywords, actors, directors, plot, genre,
+         imdb_rating, douban_rating, raw, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, now())
+    ON CONFLICT (content_type, tmdb_id) DO UPDATE
+    SET imdb_id = EXCLUDED.imdb_id,
+        aka = EXCLUDED.aka,
+        keywords = EXCLUDED.keywords,
+        actors = EXCLUDED.actors,
+        directors = EXCLUDED.directors,
+        plot = EXCLUDED.plot,
+        genre = EXCLUDED.genre,
+        imdb_rating = EXCLUDED.imdb_rating,
+        douban_rating = EXCLUDED.douban_rating,
+        raw = EXCLUDED.raw,
+        updated_at = now()
+    """
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _tmdb_upsert_statement(schema: str) -> sql.Composed:
+    """tmdb_enrichment upsert for ``schema``, composed once per schema."""
+    return TMDB_UPSERT_SQL.format(schema=sql.Identifier(schema))
+
 
 def load_tmdb_key(cfg: Dict[str, Any]) -> str:
     direct_key = cfg.get("api_key")
@@ -117,26 +145,7 @@ def upsert_tmdb(
     values: Dict[str, Any],
     raw: Dict[str, Any],
 ) -> None:
-    statement = sql.SQL(
-        """
-        INSERT INTO {schema}.tmdb_enrichment
-            (content_type, tmdb_id, imdb_id, aka, keywords, actors, directors, plot, genre,
-             imdb_rating, douban_rating, raw, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, now())
-        ON CONFLICT (content_type, tmdb_id) DO UPDATE
-        SET imdb_id = EXCLUDED.imdb_id,
-            aka = EXCLUDED.aka,
-            keywords = EXCLUDED.keywords,
-            actors = EXCLUDED.actors,
-            directors = EXCLUDED.directors,
-            plot = EXCLUDED.plot,
-            genre = EXCLUDED.genre,
-            imdb_rating = EXCLUDED.imdb_rating,
-            douban_rating = EXCLUDED.douban_rating,
-            raw = EXCLUDED.raw,
-            updated_at = now()
-        """
-    ).format(schema=sql.Identifier(schema))
+    statement = _tmdb_upsert_statement(schema)
     with conn.cursor() as cur:
         cur.execute(
             statement,
@@ -154,6 +163,7 @@ def upsert_tmdb(
                 values.get("douban_rating"),
                 json.dumps(raw),
             ),
+            prepare=True,
         )
 
 
@@ -1,4 +1,5 @@
 import argparse
+import functools
 import json
 import logging
 import os
@@ -20,6 +21,42 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_ENDPOINT = "https://theporndb.net/graphql?type=JAV"
 
+TPDB_UPSERT_SQL = sql.SQL(
+    """
+    INSERT INTO {schema}.tpdb_enrichment
+        (content_type, content_source, content_id, tpdb_id, external_type, title, original_title, aka,
+         actors, tags, studio, series, site, release_date, plot, poster_url, match_method, match_score,
+         status, error_message, raw, updated_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, now())
+    ON CONFLICT (content_type, content_source, content_id) DO UPDATE
+    SET tpdb_id = EXCLUDED.tpdb_id,
+        external_type = EXCLUDED.external_type,
+        title = EXCLUDED.title,
+        original_title = EXCLUDED.original_title,
+        aka = EXCLUDED.aka,
+        actors = EXCLUDED.actors,
+        tags = EXCLUDED.tags,
+        studio = EXCLUDED.studio,
+        series = EXCLUDED.series,
+        site = EXCLUDED.site,
+        release_date = EXCLUDED.release_date,
+        plot = EXCLUDED.plot,
+        poster_url = EXCLUDED.poster_url,
+        match_method = EXCLUDED.match_method,
+        match_score = EXCLUDED.match_score,
+        status = EXCLUDED.status,
+        error_message = EXCLUDED.error_message,
+        raw = EXCLUDED.raw,
+        updated_at = now()
+    """
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _tpdb_upsert_statement(schema: str) -> sql.Composed:
+    """tpdb_enrichment upsert for ``schema``; formatted once, reused for every ref."""
+    return TPDB_UPSERT_SQL.format(schema=sql.Identifier(schema))
+
 
 def load_tpdb_token(cfg: Dict[str, Any]) -> str:
     direct = cfg.get("api_token")
@@ -219,35 +256,7 @@ def upsert_tpdb(
     status: str,
     error_message: str | None = None,
 ) -> None:
-    statement = sql.SQL(
-        """
-        INSERT INTO {schema}.tpdb_enrichment
-            (content_type, content_source, content_id, tpdb_id, external_type, title, original_title, aka,
-             actors, tags, studio, series, site, release_date, plot, poster_url, match_method, match_score,
-             status, error_message, raw, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, now())
-        ON CONFLICT (content_type, content_source, content_id) DO UPDATE
-        SET tpdb_id = EXCLUDED.tpdb_id,
-            external_type = EXCLUDED.external_type,
-            title = EXCLUDED.title,
-            original_title = EXCLUDED.original_title,
-            aka = EXCLUDED.aka,
-            actors = EXCLUDED.actors,
-            tags = EXCLUDED.tags,
-            studio = EXCLUDED.studio,
-            series = EXCLUDED.series,
-            site = EXCLUDED.site,
-            release_date = EXCLUDED.release_date,
-            plot = EXCLUDED.plot,
-            poster_url = EXCLUDED.poster_url,
-            match_method = EXCLUDED.match_method,
-            match_score = EXCLUDED.match_score,
-            status = EXCLUDED.status,
-            error_message = EXCLUDED.error_message,
-            raw = EXCLUDED.raw,
-            updated_at = now()
-        """
-    ).format(schema=sql.Identifier(schema))
+    statement = _tpdb_upsert_statement(schema)
     with conn.cursor() as cur:
         cur.execute(
             statement,
@@ -274,6 +283,7 @@ def upsert_tpdb(
                 error_message,
                 json.dumps(raw or {}),
             ),
+            prepare=True,
         )
 
 
@@ -536,18 +546,8 @@ def fetch_tpdb_refs(
         ).format(schema=sql.Identifier(schema))
     with conn.cursor() as cur:
         cur.execute(query, (limit,))
-        rows = cur.fetchall()
-        return [
-            {
-                "content_type": row["content_type"],
-                "content_source": row["content_source"],
-                "content_id": row["content_id"],
-                "title": row.get("title"),
-                "original_title": row.get("original_title"),
-                "release_year": row.get("release_year"),
-            }
-            for row in rows
-        ]
+        # Rows already carry exactly these columns as plain dicts (dict_row).
+        return cur.fetchall()
 
 
 def main() -> None:
@@ -0,0 +1,27 @@
+import pytest
+
+from cpu.services.auth_store import AuthStore
+
+
+@pytest.mark.parametrize("admin_password", [None, ""])
+def test_unset_admin_password_rejects_login(tmp_path, admin_password):
+    store = AuthStore(str(tmp_path / "users.json"), "admin", admin_password)
+
+    assert store.login("admin", "None") is None
+    assert store.login("admin", "") is None
+
+
+def test_failed_save_leaves_cached_users_unchanged(tmp_path, monkeypatch):
+    store = AuthStore(str(tmp_path / "users.json"), "admin", "secret")
+    store.add_user("bob", "old")
+
+    def fail(data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_save", fail)
+    with pytest.raises(OSError):
+        store.update_password("bob", "old", "new")
+    monkeypatch.undo()
+
+    assert store.login("bob", "old") is not None
+    assert store.login("bob", "new") is None
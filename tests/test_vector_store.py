@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("usearch")
+
+from cpu.repositories.vector_store import USearchVectorStore  # noqa: E402
+
+
+def _metas(n):
+    return [{"source": "torrents", "pg_id": str(i), "size": i} for i in range(n)]
+
+
+def test_usearch_single_row_query(tmp_path):
+    store = USearchVectorStore(str(tmp_path), dim=4)
+    emb = np.random.default_rng(0).random((3, 4), dtype=np.float32)
+    store.add(emb, _metas(3))
+
+    hits = store.query(emb[0], topk=5)
+
+    assert len(hits) == 3
+    assert hits[0]["pg_id"] == "0"
+    assert [len(rows) for rows in store.query_batch(emb[:1], topk=5)] == [3]
+    assert [len(rows) for rows in store.query_batch(emb[:2], topk=5)] == [3, 3]
+
+
+def test_hnsw_requeues_rows_logged_after_last_index_save(tmp_path):
+    from cpu.repositories.vector_store import HNSWVectorStore
+
+    def open_store():
+        return HNSWVectorStore(str(tmp_path), dim=4, max_elements=1000, save_every_batches=100, save_interval_seconds=1e9)
+
+    rng = np.random.default_rng(0)
+    store = open_store()
+    store.add(rng.random((200, 4), dtype=np.float32), _metas(200))
+    # Logged but never saved to index.bin; reopening without flush() stands in for a crash.
+    store.add(rng.random((2, 4), dtype=np.float32), [{"source": "torrents", "pg_id": p} for p in ("200", "5")])
+
+    reopened = open_store()
+
+    assert reopened.size() == 200
+    assert ("torrents", "200") not in reopened.key_index
+    assert sorted(reopened.unpersisted_keys()) == [("torrents", "200"), ("torrents", "5")]
+    reopened.clear_unpersisted(reopened.unpersisted_keys())
+    reopened.flush()
+    assert open_store().unpersisted_keys() == []
+
+
+def test_hnsw_flush_leaves_files_alone_for_read_only_store(tmp_path):
+    from cpu.repositories.vector_store import HNSWVectorStore
+
+    def open_store():
+        return HNSWVectorStore(str(tmp_path), dim=4, max_elements=1000, save_every_batches=100, save_interval_seconds=1e9)
+
+    def snapshot():
+        return {path.name: path.read_bytes() for path in sorted(tmp_path.iterdir())}
+
+    rng = np.random.default_rng(0)
+    writer = open_store()
+    writer.add(rng.random((200, 4), dtype=np.float32), _metas(200))
+    writer.add(rng.random((1, 4), dtype=np.float32), [{"source": "torrents", "pg_id": "200"}])
+    reader = open_store()
+    # Rows the writer logs after the reader loaded must survive the reader's shutdown.
+    writer.add(rng.random((1, 4), dtype=np.float32), [{"source": "torrents", "pg_id": "201"}])
+    before = snapshot()
+
+    reader.flush()
+
+    assert snapshot() == before
+    reopened = open_store()
+    assert sorted(reopened.unpersisted_keys()) == [("torrents", "200"), ("torrents", "201")]